@@ -0,0 +1,12 @@
+__version__ = '0.1.0'
+
+# The in-process API (see makefile_generator.api), imported on first use so
+# the CLI does not pay for it at startup.
+__all__ = ['ConfigError', 'ProjectConfig', 'render', 'render_all', 'write']
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from makefile_generator import api
+        return getattr(api, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,158 @@
+'''
+In-process API: render and write mkgen projects from Python, without the CLI.
+
+    from makefile_generator import ProjectConfig, render, write
+
+    config = ProjectConfig(lang='c', compiler='gcc', standard='c11', target_system='linux')
+    makefile = render(config, 'path/to/project')     # the Makefile, as a string
+    written = write(config, 'path/to/project')       # every file, only the changed ones
+
+Nothing here imports rich, prompts, prints, sleeps or exits: an invalid
+configuration raises ConfigError (a ValueError), a failed write OSError.
+The generation-time caches (templates, source index) are used as usual.
+`mkgen generate` is a front end to these functions.
+'''
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from os import PathLike
+from pathlib import Path
+from typing import Any, Literal
+
+from makefile_generator.core.project import DEFAULT_DIRECTORIES, build_data
+from makefile_generator.core.timings import Timings
+
+StrPath = str | PathLike[str]
+
+
+class ConfigError(ValueError):
+    '''An invalid project configuration.'''
+
+
+_LIST_FIELDS = ('packages', 'unity_exclude', 'ignore', 'targets')
+
+
+@dataclass(slots=True)
+class ProjectConfig:
+    '''
+    A validated project description (see core.project for the meaning of
+    each key). Validation runs on creation, the fields are not re-checked
+    when assigned afterwards.
+    '''
+    lang: Literal['c', 'c++']
+    compiler: str
+    standard: str
+    target_system: Literal['windows', 'mac', 'linux'] | None = None
+    cross_platform: bool = False
+    output_file: str = 'main'
+    directories: dict[str, str] = field(default_factory=lambda: dict(DEFAULT_DIRECTORIES))
+    gui_lib: str | None = None
+    packages: list[str] = field(default_factory=list)
+    pkg_config: Literal['make', 'resolve'] = 'make'
+    recursive: bool = False
+    compiler_cache: str = 'none'
+    linker: str = 'auto'
+    pch: bool | int = False
+    unity_build: bool | int = False
+    unity_exclude: list[str] = field(default_factory=list)
+    ignore: list[str] = field(default_factory=list)
+    explicit_sources: bool = False
+    targets: list[dict[str, Any]] = field(default_factory=list)
+    backend: Literal['make', 'ninja'] = 'make'
+    compile_commands: bool = True
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.directories, Mapping):
+            raise ConfigError(f"'directories' must be a mapping of paths (got {self.directories!r})")
+        for name in _LIST_FIELDS:
+            if not isinstance(getattr(self, name), (list, tuple)):
+                raise ConfigError(f"'{name}' must be a list (got {getattr(self, name)!r})")
+        self.directories = {**DEFAULT_DIRECTORIES, **self.directories}
+        resolve = str(self.pkg_config).lower() == 'resolve'
+        if resolve and self.cross_platform and (self.gui_lib or self.packages):
+            raise ConfigError("'pkg_config = resolve' needs a target_system, a cross-platform Makefile queries each machine")
+        try:
+            # pkg-config only runs when rendering: validating a config never
+            # starts a subprocess.
+            build_data({**self.to_project(), 'pkg_config': 'make'} if resolve else self.to_project())
+        except ValueError as e:
+            raise ConfigError(str(e)) from e
+
+    @classmethod
+    def from_project(cls, project: Mapping[str, Any]) -> 'ProjectConfig':
+        '''
+        Build a config from a project description, as the prompts, mkgen.toml
+        and manifests give it: 'compiler' is a {'name', 'std'} table or a name
+        (with 'standard' next to it). Unknown keys are an error.
+        '''
+        project = dict(project)
+        compiler = project.pop('compiler', None) or {}
+        if isinstance(compiler, str):
+            compiler = {'name': compiler, 'std': project.pop('standard', '')}
+        known = {item.name for item in fields(cls)} - {'lang', 'compiler', 'standard'}
+        lang = project.pop('lang', None)
+        unknown = sorted(set(project) - known)
+        if unknown:
+            raise ConfigError(f"unknown project keys: {', '.join(unknown)}")
+        values = {key: value for key, value in project.items() if value is not None}
+        for name in _LIST_FIELDS:
+            if isinstance(values.get(name), str):
+                values[name] = [values[name]]
+        return cls(
+            lang=str(lang or '').lower(),  # type: ignore[arg-type]
+            compiler=str(compiler.get('name', '')),
+            standard=str(compiler.get('std', '')),
+            **values
+        )
+
+    def to_project(self) -> dict[str, Any]:
+        '''The project description core.project and core.render take.'''
+        project = {item.name: getattr(self, item.name) for item in fields(self)}
+        project['compiler'] = {'name': project.pop('compiler'), 'std': project.pop('standard')}
+        return project
+
+
+def _config(config: ProjectConfig | Mapping[str, Any]) -> ProjectConfig:
+    return config if isinstance(config, ProjectConfig) else ProjectConfig.from_project(config)
+
+
+def render_all(
+    config: ProjectConfig | Mapping[str, Any], root: StrPath = '.', timings: Timings | None = None
+) -> dict[str, str]:
+    '''
+    Every file of the project rooted at `root` (where the Makefile goes and
+    whose directories are scanned), relative to it: the Makefile or
+    build.ninja plus the generation-time files (compile_commands.json...).
+    '''
+    from makefile_generator.core.render import render_files
+
+    project = _config(config).to_project()
+    try:
+        return render_files(project, Path(root), timings)
+    except ValueError as e:
+        raise ConfigError(str(e)) from e
+
+
+def render(config: ProjectConfig | Mapping[str, Any], root: StrPath = '.') -> str:
+    '''The Makefile (build.ninja with the ninja backend) of the project rooted at `root`.'''
+    from makefile_generator.core.ninja import NINJA_FILE
+
+    files = render_all(config, root)
+    return files[NINJA_FILE] if NINJA_FILE in files else files['Makefile']
+
+
+def write(config: ProjectConfig | Mapping[str, Any], path: StrPath = '.') -> list[Path]:
+    '''
+    Render the project rooted at the directory `path` and write its files
+    there, leaving unchanged ones (and their mtimes) alone. Returns the paths
+    written.
+    '''
+    from makefile_generator.core.render import write_if_changed
+
+    root = Path(path)
+    if not root.is_dir():
+        raise NotADirectoryError(f'Output directory does not exist: {root}')
+    return [
+        root / name
+        for name, content in render_all(config, root).items()
+        if write_if_changed(root / name, content)
+    ]
@@ -0,0 +1,80 @@
+'''
+End-to-end startup benchmark for the non-interactive fast path.
+
+Runs `mkgen generate --non-interactive` in fresh interpreters (exactly what a
+CI job or a git hook does) and checks the median wall time against a budget:
+
+    python -m makefile_generator.benchmarks.startup --runs 20 --budget 300
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STARTUP_BUDGET_MS = 300
+
+GENERATE_ARGS = [
+    'generate', '--non-interactive',
+    '--target-system', 'linux',
+    '-l', 'c', '-c', 'gcc', '-std', 'c11',
+    '--binary-name', 'bench'
+]
+
+# Modules that must never be imported when nothing is shown on screen.
+FORBIDDEN_MODULES = ['rich']
+
+
+def _run_once(outdir: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, '-m', 'makefile_generator.cli', *GENERATE_ARGS, '-o', outdir],
+        check=True,
+        stdout=subprocess.DEVNULL
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def _imported_forbidden_modules(outdir: str) -> list[str]:
+    probe = (
+        'import sys\n'
+        'from makefile_generator.cli import main\n'
+        f'sys.argv = ["mkgen", *{GENERATE_ARGS!r}, "-o", {outdir!r}]\n'
+        'main()\n'
+        f'print(",".join(m for m in {FORBIDDEN_MODULES!r} if m in sys.modules))\n'
+    )
+    result = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True)
+    return [name for name in result.stdout.strip().split(',') if name]
+
+
+def measure_startup(runs: int = 10) -> dict:
+    with tempfile.TemporaryDirectory(prefix='mkgen-bench-') as outdir:
+        _run_once(outdir) # warm the filesystem and bytecode caches
+        timings = [_run_once(outdir) for _ in range(runs)]
+        forbidden = _imported_forbidden_modules(outdir)
+    return {
+        'runs': runs,
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'forbidden_imports': forbidden
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m makefile_generator.benchmarks.startup')
+    parser.add_argument('--runs', type=int, default=10, help='Number of timed runs')
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help='Median budget in milliseconds')
+    args = parser.parse_args()
+
+    result = measure_startup(args.runs)
+    result['budget_ms'] = args.budget
+    result['ok'] = result['median_ms'] <= args.budget and not result['forbidden_imports']
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
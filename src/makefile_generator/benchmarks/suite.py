@@ -0,0 +1,332 @@
+'''
+Benchmark suite: generation time of every template and build time of the
+generated files, on synthetic projects.
+
+Synthetic C or C++ projects of a given size are written to a work directory:
+`units` translation units spread over src/mod*/ (100 per directory) and
+units / 10 headers in include/, each unit including `fan_in` of them. For
+every template, the project is generated `repeat` times (render, scan and
+write, as `mkgen generate` does; the first run writes the files, the others
+find them up to date) and, where the generated file can run on this machine,
+built three times: from scratch, again with nothing to do, and after touching
+the header included by the most units.
+
+    python -m makefile_generator.benchmarks.suite --sizes 10 1000 50000 -o new.json
+    python -m makefile_generator.benchmarks.suite --compare old.json --max-ratio 1.2
+
+The report is JSON so that runs (before and after a change, two mkgen
+versions) can be compared; --max-ratio fails the run when a metric got
+slower than that against the baseline.
+'''
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+from makefile_generator import __version__
+from makefile_generator.config import TEMPLATES
+from makefile_generator.core.render import render_files, write_if_changed
+from makefile_generator.core.timings import Timings
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_FAN_IN = 4
+UNITS_PER_DIRECTORY = 100
+
+# Per-case metrics compared between two reports, lower is better.
+METRICS = [
+    ('generate', 'median_ms'),
+    ('build', 'full_s'),
+    ('build', 'noop_s'),
+    ('build', 'header_s')
+]
+
+_LANGS = {
+    'c': {'ext': '.c', 'compiler': 'gcc', 'std': 'c11'},
+    'c++': {'ext': '.cpp', 'compiler': 'g++', 'std': 'c++17'}
+}
+
+
+def _host_system() -> str:
+    if platform.system() == 'Windows':
+        return 'windows'
+    return 'mac' if platform.system() == 'Darwin' else 'linux'
+
+
+def make_project(root: Path, lang: str, units: int, fan_in: int = DEFAULT_FAN_IN, seed: int = 0) -> dict[str, Any]:
+    '''
+    Write a synthetic project under `root` (replacing src/ and include/).
+    Returns its size and the most included header, the one touched by the
+    header build.
+    '''
+    if units < 1:
+        raise ValueError('a benchmark project needs at least one translation unit')
+    ext = _LANGS[lang]['ext']
+    headers = max(fan_in, units // 10, 1)
+    rng = random.Random(seed)
+    for directory in ('src', 'include'):
+        shutil.rmtree(root / directory, ignore_errors=True)
+    (root / 'include').mkdir(parents=True)
+
+    for index in range(headers):
+        name = f'h{index:05d}'
+        (root / 'include' / f'{name}.h').write_text(
+            f'#ifndef {name.upper()}_H\n'
+            f'#define {name.upper()}_H\n\n'
+            f'static inline int {name}_value(int x) {{ return x * {index % 7 + 2} + {index}; }}\n\n'
+            '#endif\n'
+        )
+
+    included_by = [0] * headers
+    for unit in range(units - 1):
+        directory = root / 'src' / f'mod{unit // UNITS_PER_DIRECTORY:03d}'
+        directory.mkdir(parents=True, exist_ok=True)
+        picked = sorted(rng.sample(range(headers), fan_in))
+        for header in picked:
+            included_by[header] += 1
+        includes = ''.join(f'#include "h{header:05d}.h"\n' for header in picked)
+        body = ' + '.join(f'h{header:05d}_value({unit})' for header in picked) or '0'
+        (directory / f'u{unit:05d}{ext}').write_text(
+            f'{includes}\nint unit_{unit:05d}(void)\n{{\n    return {body};\n}}\n'
+        )
+    (root / 'src' / f'main{ext}').write_text('int main(void)\n{\n    return 0;\n}\n')
+
+    touched = max(range(headers), key=included_by.__getitem__)
+    return {
+        'units': units,
+        'headers': headers,
+        'fan_in': fan_in,
+        'touched_header': f'include/h{touched:05d}.h',
+        'touched_dependents': included_by[touched]
+    }
+
+
+def bench_project(template: str, lang: str) -> dict[str, Any]:
+    '''The project description benchmarked with a template (a key of TEMPLATES).'''
+    project: dict[str, Any] = {
+        'lang': lang,
+        'compiler': {'name': _LANGS[lang]['compiler'], 'std': _LANGS[lang]['std']},
+        'output_file': 'bench',
+        'recursive': True
+    }
+    if template == 'cross-platform':
+        project['cross_platform'] = True
+    elif template == 'ninja':
+        project.update(target_system=_host_system(), backend='ninja')
+    else:
+        project['target_system'] = template
+    return project
+
+
+def bench_generate(root: Path, project: Mapping[str, Any], repeat: int = 5) -> dict[str, Any]:
+    '''Time `repeat` end-to-end generations of `project` into `root`.'''
+    runs: list[float] = []
+    phases: dict[str, float] = {}
+    for _ in range(max(repeat, 1)):
+        timings = Timings()
+        files = render_files(project, root, timings)
+        with timings.phase('write'):
+            for name, content in files.items():
+                write_if_changed(root / name, content)
+        report = timings.report()
+        runs.append(report['total_ms'])
+        for name, value in report['phases_ms'].items():
+            phases[name] = phases.get(name, 0.0) + value
+    return {
+        'first_ms': runs[0],
+        'min_ms': min(runs),
+        'median_ms': round(statistics.median(runs), 3),
+        'phases_ms': {name: round(value / len(runs), 3) for name, value in phases.items()}
+    }
+
+
+def build_tool(template: str) -> str | None:
+    '''The tool that builds a template's output here, None when it cannot run on this machine.'''
+    host = _host_system()
+    if template == 'ninja':
+        return 'ninja' if shutil.which('ninja') else None
+    if template not in (host, 'cross-platform') or not shutil.which('make'):
+        return None
+    return 'make'
+
+
+def _timed_build(tool: str, root: Path) -> float:
+    start = time.perf_counter()
+    completed = subprocess.run([tool, '-C', str(root)], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f'{tool} failed: {completed.stderr.strip()[-2000:]}')
+    return round(elapsed, 3)
+
+
+def bench_build(root: Path, tool: str, touched_header: str) -> dict[str, Any]:
+    '''Full, no-op and one-header-touched builds with the generated `tool` file.'''
+    for leftover in ('build', 'bin', '.ninja_log', '.ninja_deps'):
+        path = root / leftover
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink(missing_ok=True)
+    full = _timed_build(tool, root)
+    noop = _timed_build(tool, root)
+    # A second ahead of now, so the touch shows on filesystems with coarse
+    # mtimes; put back afterwards, or the next template's builds would see
+    # a header from the future.
+    header = root / touched_header
+    original = header.stat()
+    touched = time.time() + 1
+    os.utime(header, (touched, touched))
+    try:
+        header_build = _timed_build(tool, root)
+    finally:
+        os.utime(header, ns=(original.st_atime_ns, original.st_mtime_ns))
+    return {'tool': tool, 'full_s': full, 'noop_s': noop, 'header_s': header_build}
+
+
+def run_benchmarks(
+    work_dir: Path,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    langs: Iterable[str] = ('c',),
+    templates: Iterable[str] | None = None,
+    fan_in: int = DEFAULT_FAN_IN,
+    repeat: int = 5,
+    build: bool = True,
+    on_result: Callable[[dict[str, Any]], None] | None = None
+) -> dict[str, Any]:
+    '''Benchmark every size x language x template and return the report.'''
+    templates = list(templates or TEMPLATES)
+    for template in templates:
+        if template not in TEMPLATES:
+            raise ValueError(f"unknown template '{template}' (one of {', '.join(TEMPLATES)})")
+    sizes, langs = list(sizes), list(langs)
+    for lang in langs:
+        if lang not in _LANGS:
+            raise ValueError(f"unknown language '{lang}' (one of {', '.join(_LANGS)})")
+
+    results = []
+    for lang in langs:
+        for units in sizes:
+            root = work_dir / f'{lang.replace("+", "p")}-{units}'
+            root.mkdir(parents=True, exist_ok=True)
+            layout = make_project(root, lang, units, fan_in)
+            for template in templates:
+                project = bench_project(template, lang)
+                result: dict[str, Any] = {'lang': lang, 'template': template, **layout}
+                result['generate'] = bench_generate(root, project, repeat)
+                tool = build_tool(template) if build else None
+                if tool:
+                    try:
+                        result['build'] = bench_build(root, tool, layout['touched_header'])
+                    except RuntimeError as e:
+                        result['build'] = {'tool': tool, 'error': str(e)}
+                if on_result:
+                    on_result(result)
+                results.append(result)
+
+    return {
+        'mkgen': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'settings': {
+            'sizes': sizes,
+            'langs': langs,
+            'templates': templates,
+            'fan_in': fan_in,
+            'repeat': repeat,
+            'build': build
+        },
+        'results': results
+    }
+
+
+def _case(result: Mapping[str, Any]) -> tuple:
+    return (result['lang'], result['units'], result['fan_in'], result['template'])
+
+
+def compare_reports(baseline: Mapping[str, Any], current: Mapping[str, Any]) -> list[dict[str, Any]]:
+    '''
+    Every metric measured in both reports for the same case, with its ratio
+    (current / baseline, above 1 is slower).
+    '''
+    before = {_case(result): result for result in baseline.get('results', [])}
+    rows = []
+    for result in current.get('results', []):
+        old = before.get(_case(result))
+        if old is None:
+            continue
+        for section, metric in METRICS:
+            then = (old.get(section) or {}).get(metric)
+            now = (result.get(section) or {}).get(metric)
+            if not then or now is None:
+                continue
+            rows.append({
+                'lang': result['lang'],
+                'units': result['units'],
+                'template': result['template'],
+                'metric': f'{section}.{metric}',
+                'baseline': then,
+                'current': now,
+                'ratio': round(now / then, 3)
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m makefile_generator.benchmarks.suite')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, metavar='N', help='Translation units per project')
+    parser.add_argument('--fan-in', type=int, default=DEFAULT_FAN_IN, metavar='N', help='Headers each translation unit includes')
+    parser.add_argument('--lang', dest='langs', action='append', choices=list(_LANGS), help='Project language, repeatable (default: c)')
+    parser.add_argument('--template', dest='templates', action='append', choices=list(TEMPLATES), help='Template, repeatable (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed generations per project and template')
+    parser.add_argument('--no-build', dest='build', action='store_false', help='Only time generation')
+    parser.add_argument('--work-dir', help='Where to write the projects (default: a temporary directory)')
+    parser.add_argument('-o', '--output', help='Write the report to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='Earlier report to compare the results with')
+    parser.add_argument('--max-ratio', type=float, metavar='RATIO', help='Fail when a metric is slower than RATIO x the baseline')
+    args = parser.parse_args()
+
+    def progress(result: dict[str, Any]) -> None:
+        print(
+            f"{result['lang']} {result['units']} {result['template']}: "
+            f"generate {result['generate']['median_ms']} ms, build {json.dumps(result.get('build'))}",
+            file=sys.stderr
+        )
+
+    with tempfile.TemporaryDirectory(prefix='mkgen-bench-') as temporary:
+        report = run_benchmarks(
+            Path(args.work_dir or temporary),
+            sizes=args.sizes,
+            langs=args.langs or ['c'],
+            templates=args.templates,
+            fan_in=args.fan_in,
+            repeat=args.repeat,
+            build=args.build,
+            on_result=progress
+        )
+    ok = True
+    if args.compare:
+        with open(args.compare) as file:
+            report['comparison'] = compare_reports(json.load(file), report)
+        if args.max_ratio:
+            ok = all(row['ratio'] <= args.max_ratio for row in report['comparison'])
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n')
+    else:
+        print(text)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
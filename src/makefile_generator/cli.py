@@ -3,16 +3,13 @@ import signal
 import sys
 import time
 
-from rich.align import Align
-from rich.console import Console
-from rich.text import Text
-
 from makefile_generator.cli_helpers.help_text import (
     REQUIRE_MUTUALLY_EXCLUSIVE,
     USAGE_TEXT,
     show_help,
 )
 from makefile_generator.cli_helpers.parser import build_parser
+from makefile_generator.core.paths import env_flag
 
 ASCII_HEADER = '''
 
@@ -26,12 +23,18 @@ ASCII_HEADER = '''
 '''
 
 def gradient_text(text, colors):
+    from rich.text import Text
+
     gradient = Text()
     for i, char in enumerate(text):
         gradient.append(char, style=f"bold {colors[i % len(colors)]}")
     return gradient
 
-def main() -> None:
+def _show_banner() -> None:
+    from rich.align import Align
+    from rich.console import Console
+    from rich.text import Text
+
     colors = ["red", "orange1", "yellow", "green", "cyan", "blue", "magenta"]
     console = Console()
     def graceful_exit(signal, frame):
@@ -44,16 +47,40 @@ def main() -> None:
     console.print(Align.center(welcome_text))
     console.print("\n")
     time.sleep(.5) #show the ascii longer lol
+
+def main() -> None:
+    started = time.perf_counter()
     parser = build_parser()
     args = parser.parse_args()
-    #FIXME: fix this if i ever add other commands
+    if getattr(args, 'timings', None):
+        from makefile_generator.core.timings import Timings
+        args.phase_timings = Timings(started)
+        args.phase_timings.add('parse', time.perf_counter() - started)
+    # A saved mkgen.toml answers every question: render right away, quietly.
+    configured = False
+    if args.command == 'generate' and not args.help:
+        from makefile_generator.cli_helpers.command import project_config
+        config = project_config(args)
+        configured = config is not None and config.is_file()
+    non_interactive = (
+        getattr(args, 'non_interactive', False)
+        or getattr(args, 'json', False)
+        or configured
+        or env_flag('MKGEN_NONINTERACTIVE')
+    )
+    if hasattr(args, 'non_interactive'):
+        args.non_interactive = non_interactive
+    if non_interactive:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+    else:
+        _show_banner()
+    if args.command is None:
+        show_help(USAGE_TEXT)
     if args.command == 'generate':
         if args.help:
             show_help()
-        if not (args.target_system or args.cross_platform):
-            show_help(REQUIRE_MUTUALLY_EXCLUSIVE)
-    else:
-        show_help(USAGE_TEXT)
+        if not (args.target_system or args.cross_platform or configured):
+            show_help(REQUIRE_MUTUALLY_EXCLUSIVE, status=2 if non_interactive else 0)
 
     args.func(args)
 
@@ -1,32 +1,54 @@
+from __future__ import annotations
+
 import argparse
 import sys
 import time
+from functools import cache
 from pathlib import Path
-from typing import Literal
-
-from jinja2 import Environment, FileSystemLoader
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.text import Text
+from typing import TYPE_CHECKING, Literal, NoReturn
 
 from makefile_generator.config import (
     C_STANDARDS,
     COMPILERS,
-    CPP_STANDARDS,
-    RAYLIB_CFLAGS,
-    RAYLIB_FLAGS,
-    SDL2_CFLAGS,
-    SDL2_FLAGS,
-    SFML_CFLAGS,
-    SFML_FLAGS,
-    TEMPLATES_DIR,
-    TEMPLATES
+    CPP_STANDARDS
+)
+from makefile_generator.core.project import (
+    GUI_LIBS,
+    get_key_for,
+    is_valid_standard
 )
-from makefile_generator.utils.display_utils import display_panel_text
-from makefile_generator.utils.prompt_utils import get_user_input, single_choice
 
-console = Console()
-console_err = Console(stderr=True)
+if TYPE_CHECKING:
+    from rich.console import Console, RenderableType
+
+# rich and jinja2 are only imported once they are actually needed, so the
+# non-interactive path never pays for the console machinery.
+@cache
+def _console(stderr: bool = False) -> Console:
+    from rich.console import Console
+    return Console(stderr=stderr)
+
+def _error(message: str, args: argparse.Namespace) -> NoReturn:
+    if args.non_interactive:
+        print(f'mkgen: error: {message}', file=sys.stderr)
+    else:
+        _console(stderr=True).print(f'[bold red]Error:[/bold red] {message}')
+    sys.exit(1)
+
+def _missing_option(option: str, args: argparse.Namespace) -> NoReturn:
+    _error(f'{option} is missing or invalid (prompts are disabled in non-interactive mode).', args)
+
+def _panel(text: RenderableType, args: argparse.Namespace, **kwargs) -> None:
+    if args.non_interactive:
+        return
+    from makefile_generator.utils.display_utils import display_panel_text
+    display_panel_text(text, stream=_console(), **kwargs)
+
+def _single_choice(prompt: str, options: list[str], option: str, args: argparse.Namespace) -> str:
+    if args.non_interactive:
+        _missing_option(option, args)
+    from makefile_generator.utils.prompt_utils import single_choice
+    return single_choice(prompt, options, _console())
 
 
 def _create_progress_description(
@@ -45,136 +67,128 @@ def _create_progress_description(
 
     return description
 
+def _output_dir(args: argparse.Namespace) -> Path:
+    #TODO: add check if not a dir use Path.cwd()
+    return Path(args.output) if args.output else Path.cwd()
+
 #TODO: make it better
 def _generate_makefile(
-    data: dict[str, dict[str, str] | str | bool],
+    files: dict[str, str],
     args: argparse.Namespace,
     progress_description: str = 'Generating your Makefile...'
 ) -> None:
-    template = None
-    env = Environment(
-        loader=FileSystemLoader(TEMPLATES_DIR), #type: ignore
-        lstrip_blocks=True,
-        trim_blocks=True
-    )
-    #TODO: handle TemplateNotFound
-    if args.cross_platform:
-        template = env.get_template(TEMPLATES.get('cross-platform', ''))
-    else:
-        template = env.get_template(TEMPLATES.get(args.target_system, ''))
-        
-    if template:
-        makefile = template.render(data)
-        outdir = Path(args.output) if args.output else Path.cwd()
-        #TODO: add check if not a dir use Path.cwd()
-        outdir = outdir / 'Makefile'
-        if outdir.exists(): #TODO: make overwrite better (maybe add path change..etc)
-            user_choice = single_choice('A Makefile already exists in output directory.\nDo you wanna overwrite it?', ['yes', 'no'], console)
+    from makefile_generator.core.render import file_status, write_atomic, write_if_changed
+    from makefile_generator.core.timings import phase
+
+    timings = getattr(args, 'phase_timings', None)
+    # The Makefile, or build.ninja with the ninja backend.
+    name = next((name for name in ('Makefile', 'build.ninja') if name in files), 'Makefile')
+    makefile = files.pop(name, None)
+    if makefile:
+        outdir = _output_dir(args) / name
+        with phase(timings, 'write'):
+            status = file_status(outdir, makefile)
+        # Scripted runs regenerate on purpose, so they never ask before overwriting.
+        # Interactive ones only ask when something would actually be lost.
+        if status in ('changed', 'edited') and not args.non_interactive: #TODO: make overwrite better (maybe add path change..etc)
+            from makefile_generator.utils.prompt_utils import single_choice
+            if status == 'edited':
+                question = f'The existing {name} was edited by hand (or not generated by mkgen).\nDo you wanna overwrite it?'
+            else:
+                question = f'A different {name} already exists in output directory.\nDo you wanna overwrite it?'
+            user_choice = single_choice(question, ['yes', 'no'], _console())
             if user_choice == 'no':
-                display_panel_text(
-                    '[yellow]Makefile generation skipped (existing file not overwritten)[/yellow]',
-                    stream=console,
+                _panel(
+                    f'[yellow]{name} generation skipped (existing file not overwritten)[/yellow]',
+                    args,
                     title='Makefile Generation Skipped',
                     border_style='yellow'
                 )
                 sys.exit(0)
-        console.print('\n')
         try:
-            with Progress(
-                SpinnerColumn(spinner_name='dots'),
-                TextColumn('[progress.description]{task.description}'),
-                transient=True
-            ) as progress:
-                with open(outdir , 'wt') as file:
+            # Side files (precompiled header...) keep their mtime when unchanged,
+            # so nothing depending on them gets rebuilt.
+            with phase(timings, 'write'):
+                for side_file, content in files.items():
+                    write_if_changed(outdir.parent / side_file, content)
+            if status == 'unchanged':
+                # Same content: leave the file and its mtime alone so make does
+                # not consider everything depending on the Makefile out of date.
+                _panel(
+                    f'{name} at [bold yellow]{outdir.parent}[/bold yellow] is already up to date',
+                    args,
+                    title='Up To Date'
+                )
+                return
+            if args.non_interactive:
+                with phase(timings, 'write'):
+                    write_atomic(outdir, makefile)
+            else:
+                from rich.progress import Progress, SpinnerColumn, TextColumn
+
+                _console().print('\n')
+                with Progress(
+                    SpinnerColumn(spinner_name='dots'),
+                    TextColumn('[progress.description]{task.description}'),
+                    transient=True
+                ) as progress:
                     task = progress.add_task(description=f'[bold magenta]{progress_description}')
-                    file.write(makefile)
+                    with phase(timings, 'write'):
+                        write_atomic(outdir, makefile)
                     # File creation is extremely fast, so I'm faking a spinner for UX purposes.
                     # The sleep call is purely to give the spinner time to display.
                     time.sleep(2)
                     progress.remove_task(task)
 
-            display_panel_text(
-                f'✅ Makefile successfully generated at: [bold yellow]{outdir.parent} [/bold yellow]',
-                stream=console,
+            _panel(
+                f'✅ {name} successfully generated at: [bold yellow]{outdir.parent} [/bold yellow]',
+                args,
                 title='Success'
             )
         except FileNotFoundError:
-            console_err.print("[bold red]Error:[/bold red] Output directory does not exist.")
-            sys.exit(1)
+            _error('Output directory does not exist.', args)
 
         except PermissionError:
-            console_err.print("[bold red]Error:[/bold red] Permission denied while writing the makefile.")
-            sys.exit(1)
+            _error('Permission denied while writing the makefile.', args)
 
         except IsADirectoryError:
-            console_err.print("[bold red]Error:[/bold red] Output path is a directory, not a file.")
-            sys.exit(1)
+            _error('Output path is a directory, not a file.', args)
 
         except OSError as e:
-            console_err.print(f"[bold red]Error:[/bold red] Failed to write makefile: {e}")
-            sys.exit(1)
+            _error(f'Failed to write makefile: {e}', args)
 
 
-def _choose_langage(data: dict) -> str:
+def _choose_langage(args: argparse.Namespace) -> str:
     langs = ['c++', 'c']
-    choice = single_choice('Choose the Langage', langs, console)
-    if choice.lower() == 'c++':
-        data['src_ext'] = '.cpp'
-        data['compiler']['var'] = 'CXX'
-    else:
-        data['src_ext'] = '.c'
-        data['compiler']['var'] = 'CC'
-    return choice
+    return _single_choice('Choose the Langage', langs, '--lang', args).lower()
 
-def _choose_compiler() -> str:
-    return single_choice('Choose your compiler of use', COMPILERS, console)
+def _choose_compiler(args: argparse.Namespace) -> str:
+    return _single_choice('Choose your compiler of use', COMPILERS, '--compiler', args)
 
-def _choose_standard(langage: str) -> str:
+def _choose_standard(langage: str, args: argparse.Namespace) -> str:
     prompt = "Choose the compiler standard you wanna use"
-    return single_choice(prompt, C_STANDARDS, console) if langage.lower() == 'c' else single_choice(prompt, CPP_STANDARDS, console)
-
-def _chose_binary_name() -> str :
-    return get_user_input("Enter the output binary file's name", console)
+    return _single_choice(prompt, C_STANDARDS if langage.lower() == 'c' else CPP_STANDARDS, '--standard', args)
 
-def get_key_for(target_system: str, /):
-    if target_system == 'windows':
-        return 'win32'
-    else:
-        return 'unix'
+def _chose_binary_name(args: argparse.Namespace) -> str :
+    if args.non_interactive:
+        return 'main'
+    from makefile_generator.utils.prompt_utils import get_user_input
+    return get_user_input("Enter the output binary file's name", _console())
 
-def _choose_gui_lib(data: dict[str, dict[str, str] | str | bool], args: argparse.Namespace) -> None:
-    gui_libs = ['sdl2', 'sfml', 'raylib']
-    lib = single_choice('Chose your graphical library of use', gui_libs, console)
-    if args.cross_platform:
-        if lib == 'sfml':
-            data['gui_lib_flags'] = SFML_FLAGS['win32']
-            data['unix_gui_lib_flags'] = SFML_FLAGS['unix']
-            data['gui_lib_cflags'] = SFML_CFLAGS
-        elif lib == 'sdl2':
-            data['gui_lib_flags'] = SDL2_FLAGS['win32']
-            data['unix_gui_lib_flags'] = SDL2_FLAGS['unix']
-            data['gui_lib_cflags'] = SDL2_CFLAGS
-        else:
-            data['gui_lib_flags'] = RAYLIB_FLAGS['win32']
-            data['unix_gui_lib_flags'] = RAYLIB_FLAGS['unix']
-            data['gui_lib_cflags'] = RAYLIB_CFLAGS
-    else:
-        if lib == 'sfml':
-            data['gui_lib_flags'] = SFML_FLAGS[get_key_for(args.target_system)]
-            data['gui_lib_cflags'] = SFML_CFLAGS
-        elif lib == 'sdl2':
-            data['gui_lib_flags'] = SDL2_FLAGS[get_key_for(args.target_system)]
-            data['gui_lib_cflags'] = SDL2_CFLAGS
-        else:
-            data['gui_lib_flags'] = RAYLIB_FLAGS[get_key_for(args.target_system)]
-            data['gui_lib_cflags'] = RAYLIB_CFLAGS
+def _choose_gui_lib(args: argparse.Namespace) -> str:
+    if args.gui_lib and args.gui_lib.lower() in GUI_LIBS:
+        return args.gui_lib.lower()
+    return _single_choice('Chose your graphical library of use', GUI_LIBS, '--gui-lib', args)
 
 
-def _prompt_gui_lib_usage(data:  dict[str, dict[str, str] | str | bool], args: argparse.Namespace) -> None:
-    choice = single_choice('Do you intend on using a gui libray?', ['yes', 'no'], console)
+def _prompt_gui_lib_usage(args: argparse.Namespace) -> str | None:
+    if args.non_interactive:
+        return None
+    from makefile_generator.utils.prompt_utils import single_choice
+    choice = single_choice('Do you intend on using a gui libray?', ['yes', 'no'], _console())
     if choice == 'yes':
-        data['use_gui_lib'] = True
-        _choose_gui_lib(data, args)
+        return _choose_gui_lib(args)
+    return None
 
 def is_target_correct(args: argparse.Namespace) -> bool:
     systems = {'windows', 'mac', 'linux'}
@@ -185,79 +199,421 @@ def is_target_correct(args: argparse.Namespace) -> bool:
         return True
     return False
 
-def _target_err():
-    text = Text()
-    text.append("Error: ", style="bold red")
-    text.append(
-        "Please enter a valid target system (e.g. linux, windows, macos).",
-        style='bold white'
-    )
-
-    console_err.print(text)
-    sys.exit(1)
+def _target_err(args: argparse.Namespace) -> NoReturn:
+    _error('Please enter a valid target system (e.g. linux, windows, macos).', args)
 
-def generate(args: argparse.Namespace) -> None:
-    if not is_target_correct(args):
-        _target_err()
-    #TODO: add folders check
-    langage = None
-    data = {
-        'compiler' : {
-         'var' : '',
-         'name' : '',
-         'std' : ''
-        },
-        'directories' : {
-            'bin' : 'bin',
-            'src' : 'src',
-            'build' : 'build',
-            'include' : 'include',
-        },
-        'output_file' : 'main',
-        'src_ext' : ''
+def _resolve_project(args: argparse.Namespace) -> dict:
+    """Collect the project description from the flags, prompting for whatever is missing."""
+    project = {
+        'target_system': args.target_system.lower() if args.target_system else None,
+        'cross_platform': args.cross_platform,
+        'recursive': args.recursive,
+        'compiler_cache': args.compiler_cache,
+        'linker': args.linker,
+        'pch': args.pch,
+        'unity_build': args.unity_build,
+        'unity_exclude': args.unity_exclude,
+        'ignore': args.ignore,
+        'explicit_sources': args.explicit_sources,
+        'compile_commands': args.compile_commands,
+        'backend': args.backend,
+        'packages': args.packages,
+        'pkg_config': args.pkg_config
     }
-    display_panel_text(
-        _create_progress_description(args.lang, args.target_system, end=''),
-        stream=console,
-        title='INFO',
-        border_style='green',
-    )
-    if args.lang and args.lang.lower() == 'c':
-        data['src_ext'] = '.c'
-        data['compiler']['var'] = 'CC'
-        langage = args.lang.lower()
-    elif args.lang and args.lang.lower() == 'c++':
-        langage = args.lang.lower()
-        data['compiler']['var'] = 'CXX'
-        data['src_ext'] = '.cpp'
+    if args.lang and args.lang.lower() in ('c', 'c++'):
+        project['lang'] = args.lang.lower()
     else:
-        langage = _choose_langage(data)
+        project['lang'] = _choose_langage(args)
+    langage = project['lang']
 
+    compiler = {}
     if args.compiler and args.compiler.lower() in COMPILERS:
-        data['compiler']['name'] = args.compiler
+        compiler['name'] = args.compiler
     else:
-        data['compiler']['name'] = _choose_compiler()
-    if args.standard:
-        if langage.lower() == 'c':
-            if args.standard.upper() in C_STANDARDS or args.standard.lower() == 'c18':
-                data['compiler']['std'] = args.standard.lower()
-            else:
-                data['compiler']['std'] = _choose_standard(langage).lower()
-        else:
-            if args.standard.upper() in CPP_STANDARDS:
-                data['compiler']['std'] = args.standard.lower()
-            else:
-                data['compiler']['std'] = _choose_standard(langage).lower()
+        compiler['name'] = _choose_compiler(args)
+    if args.standard and is_valid_standard(langage, args.standard):
+        compiler['std'] = args.standard.lower()
     else:
-        data['compiler']['std'] = _choose_standard(langage).lower()
+        compiler['std'] = _choose_standard(langage, args).lower()
+    project['compiler'] = compiler
+
+    if args.target:
+        from makefile_generator.core.targets import parse_target
+        project['targets'] = [parse_target(spec) for spec in args.target]
     if args.binary_name:
-        data['output_file'] = args.binary_name
+        project['output_file'] = args.binary_name
+    elif not args.target:
+        project['output_file'] = _chose_binary_name(args)
+    if args.use_gui_lib or args.gui_lib:
+        project['gui_lib'] = _choose_gui_lib(args)
     else:
-        data['output_file'] = _chose_binary_name()
-    if args.use_gui_lib:
-        data['use_gui_lib'] = True
-        _choose_gui_lib(data, args)
+        project['gui_lib'] = _prompt_gui_lib_usage(args)
+    return project
+
+def project_config(args: argparse.Namespace) -> Path | None:
+    """The mkgen.toml `generate` loads and saves, None with --no-config."""
+    if args.no_config:
+        return None
+    from makefile_generator.core.config_file import CONFIG_NAME
+    return Path(args.config) if args.config else _output_dir(args) / CONFIG_NAME
+
+def _overrides(args: argparse.Namespace) -> dict:
+    """The parts of the project description given on the command line."""
+    overrides: dict = {}
+    if args.target_system:
+        overrides.update(target_system=args.target_system.lower(), cross_platform=False)
+    if args.cross_platform:
+        overrides['cross_platform'] = True
+    if args.lang:
+        overrides['lang'] = args.lang.lower()
+    if args.compiler:
+        overrides.setdefault('compiler', {})['name'] = args.compiler
+    if args.standard:
+        overrides.setdefault('compiler', {})['std'] = args.standard.lower()
+    if args.binary_name:
+        overrides['output_file'] = args.binary_name
+    if args.gui_lib:
+        overrides['gui_lib'] = args.gui_lib.lower()
+    if args.target:
+        from makefile_generator.core.targets import parse_target
+        overrides['targets'] = [parse_target(spec) for spec in args.target]
+    if args.packages:
+        overrides['packages'] = args.packages
+    for key in ('compiler_cache', 'linker', 'pch', 'unity_build', 'backend', 'pkg_config'):
+        if getattr(args, key) is not None:
+            overrides[key] = getattr(args, key)
+    if args.recursive:
+        overrides['recursive'] = True
+    if args.unity_exclude:
+        overrides['unity_exclude'] = args.unity_exclude
+    if args.ignore:
+        overrides['ignore'] = args.ignore
+    if args.explicit_sources:
+        overrides['explicit_sources'] = True
+    if not args.compile_commands:
+        overrides['compile_commands'] = False
+    return overrides
+
+def _write_timings(args: argparse.Namespace) -> None:
+    """Print (--timings) or save (--timings PATH) the phase timings as JSON."""
+    import json
+
+    report = json.dumps(args.phase_timings.report(), indent=2)
+    if args.timings == '-':
+        print(report)
+        return
+    try:
+        Path(args.timings).write_text(report + '\n')
+    except OSError as e:
+        _error(f'Failed to write the timings: {e}', args)
+
+def generate(args: argparse.Namespace) -> None:
+    from makefile_generator.core.timings import phase
+
+    timings = getattr(args, 'phase_timings', None)
+    config = project_config(args)
+    if config and config.is_file():
+        # Saved configuration plus the flags given this time: nothing to ask.
+        from makefile_generator.core.config_file import load_config
+        from makefile_generator.core.project import merge_projects
+        try:
+            with phase(timings, 'config'):
+                project = merge_projects(load_config(config), _overrides(args))
+        except ValueError as e:
+            _error(str(e), args)
     else:
-        _prompt_gui_lib_usage(data, args)
+        if not is_target_correct(args):
+            _target_err(args)
+        _panel(
+            _create_progress_description(args.lang, args.target_system, end=''),
+            args,
+            title='INFO',
+            border_style='green',
+        )
+        with phase(timings, 'config'):
+            project = _resolve_project(args)
+    with phase(timings, 'import'):
+        from makefile_generator.api import ConfigError, ProjectConfig, render_all
+    try:
+        files = render_all(ProjectConfig.from_project(project), _output_dir(args), timings)
+    except ConfigError as e:
+        _error(str(e), args)
+
+    _generate_makefile(files, args, _create_progress_description(project['lang'], args.target_system)) #type: ignore
+    if config:
+        from makefile_generator.core.config_file import dump_config
+        from makefile_generator.core.render import write_if_changed
+        try:
+            with phase(timings, 'write'):
+                write_if_changed(config, dump_config(project))
+        except OSError as e:
+            _error(f'Failed to save {config}: {e}', args)
+    if timings:
+        _write_timings(args)
+
+
+def generate_many(args: argparse.Namespace) -> None:
+    from makefile_generator.core.batch import generate_many as run_batch, summarize
+    from makefile_generator.core.manifest import load_manifest
+
+    try:
+        projects = load_manifest(Path(args.manifest))
+    except FileNotFoundError:
+        _error(f'Manifest not found: {args.manifest}', args)
+    except ValueError as e:
+        _error(str(e), args)
+
+    if args.non_interactive:
+        results = run_batch(projects, args.jobs)
+    else:
+        from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+        with Progress(
+            TextColumn('[bold magenta]Generating Makefiles'),
+            BarColumn(),
+            MofNCompleteColumn(),
+            console=_console(),
+            transient=True
+        ) as progress:
+            task = progress.add_task('batch', total=len(projects))
+            results = run_batch(projects, args.jobs, on_result=lambda _: progress.advance(task))
+
+    summary = summarize(results)
+    failures = [result for result in results if result.status == 'failed']
+    if args.non_interactive:
+        for result in failures:
+            print(f'mkgen: failed: {result.output}: {result.message}', file=sys.stderr)
+        print(f"written={summary['written']} unchanged={summary['unchanged']} failed={summary['failed']}")
+    else:
+        lines = [
+            f"[bold green]{summary['written']}[/bold green] written, "
+            f"[bold]{summary['unchanged']}[/bold] unchanged, "
+            f"[bold red]{summary['failed']}[/bold red] failed"
+        ]
+        cache_counters = summary['template_cache']
+        lines.append(
+            f"[dim]template cache: {cache_counters.get('memory_hits', 0)} memory hit(s), "
+            f"{cache_counters.get('disk_hits', 0)} disk hit(s), {cache_counters.get('misses', 0)} miss(es)[/dim]"
+        )
+        lines += [f'[red]✗[/red] {result.output}: {result.message}' for result in failures]
+        _panel(
+            '\n'.join(lines),
+            args,
+            title='Batch Generation',
+            border_style='red' if failures else 'green'
+        )
+    if failures:
+        sys.exit(1)
+
+
+def manage_cache(args: argparse.Namespace) -> None:
+    from makefile_generator.core.templates import clear_template_cache, disk_cache_info
+
+    if args.clear:
+        removed = clear_template_cache()
+        _panel(f'Removed [bold yellow]{removed}[/bold yellow] compiled template(s)', args, title='Cache Cleared', border_style='yellow')
+        return
+    info = disk_cache_info()
+    if args.non_interactive:
+        print(f"{info['directory']} {info['entries']} {info['size']}")
+        return
+    _panel(
+        f"Directory: [bold yellow]{info['directory']}[/bold yellow]\n"
+        f"Compiled templates: [bold]{info['entries']}[/bold] ({info['size'] / 1024:.1f} KiB)",
+        args,
+        title='Template Cache'
+    )
+
+
+def _format_size(size: int) -> str:
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if size < 1024 or unit == 'GiB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return ''
+
+
+def analyze(args: argparse.Namespace) -> None:
+    import json
+
+    from makefile_generator.core.analyze import analyze as analyze_includes
+
+    try:
+        report = analyze_includes(Path(args.path), args.src, args.include, use_cache=not args.no_cache)
+    except FileNotFoundError as e:
+        _error(str(e), args)
+
+    if args.non_interactive:
+        report = dict(report)
+        report['header_costs'] = report['header_costs'][:args.top]
+        report['translation_units'] = report['translation_units'][:args.top]
+        print(json.dumps(report, indent=2))
+        return
+
+    from rich.console import Group
+    from rich.table import Table
+
+    table = Table(box=None, header_style='bold magenta')
+    table.add_column('Header')
+    table.add_column('Fan-in', justify='right')
+    table.add_column('Direct', justify='right')
+    table.add_column('Depth', justify='right')
+    table.add_column('Rebuild cost', justify='right')
+    for row in report['header_costs'][:args.top]:
+        table.add_row(
+            row['path'],
+            str(row['fan_in']),
+            str(row['direct_fan_in']),
+            str(row['depth']),
+            _format_size(row['rebuild_cost'])
+        )
+    summary = (
+        f"[bold]{report['sources']}[/bold] translation unit(s), [bold]{report['headers']}[/bold] header(s), "
+        f"[bold]{report['edges']}[/bold] project include(s)\n"
+        f"[dim]rebuild cost: size of every translation unit a change to the header recompiles, "
+        f"its own code plus the project headers it pulls in[/dim]"
+    )
+    renderables = [summary, '', table]
+    if report['cycles']:
+        renderables.append('')
+        renderables.append(f"[bold red]{len(report['cycles'])} include cycle(s):[/bold red]")
+        renderables += [f"[red]↻[/red] {', '.join(cycle)}" for cycle in report['cycles']]
+    cache_counters = report['cache']
+    renderables.append(f"\n[dim]scan cache: {cache_counters['hits']} hit(s), {cache_counters['misses']} miss(es)[/dim]")
+    _panel(
+        Group(*renderables),
+        args,
+        title='Include Analysis',
+        border_style='red' if report['cycles'] else 'green'
+    )
+
+
+def report(args: argparse.Namespace) -> None:
+    import json
+
+    from makefile_generator.core.trace import CHROME_TRACE_NAME, build_profile
+
+    build_dir = Path(args.build_dir)
+    try:
+        summary, chrome_trace = build_profile(build_dir, args.top)
+    except FileNotFoundError as e:
+        _error(str(e), args)
+
+    trace_path = Path(args.trace_output) if args.trace_output else build_dir / CHROME_TRACE_NAME
+    try:
+        trace_path.write_text(json.dumps(chrome_trace))
+    except OSError as e:
+        _error(f'Failed to write the Chrome trace: {e}', args)
+    summary['chrome_trace'] = str(trace_path)
+
+    if args.non_interactive:
+        print(json.dumps(summary, indent=2))
+        return
+
+    from rich.console import Group
+    from rich.table import Table
+
+    units = Table(box=None, header_style='bold magenta')
+    units.add_column('Translation unit')
+    units.add_column('Time', justify='right')
+    for row in summary['slowest_units']:
+        units.add_row(row['source'], f"{row['duration_ms']:.0f} ms")
+    renderables = [
+        f"[bold]{summary['units']}[/bold] compile(s): [bold]{summary['compile_time_ms'] / 1000:.1f} s[/bold] of compile time "
+        f"in [bold]{summary['wall_time_ms'] / 1000:.1f} s[/bold] ({summary['parallelism']}x parallel)",
+        '',
+        units
+    ]
+    if summary['slowest_headers']:
+        headers = Table(box=None, header_style='bold magenta')
+        headers.add_column('Header (clang -ftime-trace)')
+        headers.add_column('Total', justify='right')
+        headers.add_column('Included', justify='right')
+        for row in summary['slowest_headers']:
+            headers.add_row(row['header'], f"{row['total_ms']:.0f} ms", str(row['included']))
+        renderables += ['', headers]
+    else:
+        renderables.append('\n[dim]No header timings: build with clang to get -ftime-trace data.[/dim]')
+    renderables.append(f'\nChrome trace: [bold yellow]{trace_path}[/bold yellow] (open it in chrome://tracing or ui.perfetto.dev)')
+    _panel(Group(*renderables), args, title='Build Profile')
+
+
+def _watched_paths(projects: list[dict]) -> list[Path]:
+    from makefile_generator.core.project import DEFAULT_DIRECTORIES
+
+    directories = []
+    for project in projects:
+        layout = {**DEFAULT_DIRECTORIES, **(project.get('directories') or {})}
+        root = Path(project['output'])
+        directories += [root / layout['src'], root / layout['include']]
+    return sorted(set(directories))
+
+
+def watch(args: argparse.Namespace) -> None:
+    import subprocess
+    from datetime import datetime
+
+    from makefile_generator.core.batch import generate_project
+    from makefile_generator.core.config_file import load_config
+    from makefile_generator.core.manifest import load_manifest, load_toml
+    from makefile_generator.core.packages import clear_shell_cache
+    from makefile_generator.core.watch import Watcher
+
+    manifest = Path(args.manifest)
+
+    def log(message: str, style: str = '') -> None:
+        if args.non_interactive:
+            print(f'mkgen: {message}', flush=True)
+        else:
+            stamp = datetime.now().strftime('%H:%M:%S')
+            _console().print(f'[dim]{stamp}[/dim] ' + (f'[{style}]{message}[/{style}]' if style else message))
+
+    def load() -> list[dict] | None:
+        try:
+            if manifest.suffix.lower() == '.toml' and 'projects' not in load_toml(manifest):
+                # A single project's mkgen.toml rather than a batch manifest.
+                return [{**load_config(manifest), 'output': str(manifest.parent.resolve())}]
+            return load_manifest(manifest)
+        except FileNotFoundError:
+            log(f'{manifest} not found, waiting for it', 'yellow')
+        except ValueError as e:
+            log(str(e), 'red')
+        return None
+
+    def regenerate(projects: list[dict]) -> None:
+        # A package installed since the last run must show up in 'resolve' mode.
+        clear_shell_cache()
+        for project in projects:
+            result = generate_project(project)
+            if result.status == 'failed':
+                log(f'{result.output}: {result.message}', 'red')
+            elif result.status == 'written':
+                log(f'regenerated {result.output}', 'green')
+            if args.make and result.status == 'written':
+                completed = subprocess.run(['make', '-C', result.output, *args.make_args])
+                if completed.returncode:
+                    log(f'make failed in {result.output} (exit {completed.returncode})', 'red')
 
-    _generate_makefile(data, args, _create_progress_description(langage, args.target_system)) #type: ignore
+    if not manifest.is_file():
+        _error(f'Manifest not found: {manifest}', args)
+    projects = load() or []
+    regenerate(projects)
+    watched = _watched_paths(projects)
+    watcher = Watcher(watched, [manifest], poll_interval=args.poll_interval, force_polling=args.poll)
+    log(f'watching {len(watched)} director{"y" if len(watched) == 1 else "ies"} and {manifest} ({watcher.backend}), Ctrl+C to stop', 'bold')
+    try:
+        while True:
+            watcher.wait(args.debounce)
+            projects = load()
+            if projects is None:
+                continue
+            regenerate(projects)
+            if _watched_paths(projects) != watched:
+                # The manifest moved or added source trees.
+                watcher.close()
+                watched = _watched_paths(projects)
+                watcher = Watcher(watched, [manifest], poll_interval=args.poll_interval, force_polling=args.poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
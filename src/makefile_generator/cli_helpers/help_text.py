@@ -3,7 +3,15 @@ import sys
 HELP_TEXT = '''
 usage: mkgen generate [-h] (--target-system TARGET_SYSTEM | --cross-platform)
                       [-l LANG] [-c COMPILER] [-std STANDARD] [--use-gui-lib]
-                      [--binary-name BINARY_NAME] [-o OUTPUT]
+                      [--gui-lib GUI_LIB] [--package NAME] [--resolve-pkg-config]
+                      [--binary-name BINARY_NAME] [-r]
+                      [--compiler-cache {auto,ccache,sccache,none}]
+                      [--linker {auto,mold,lld,gold,bfd,default}] [--pch [N]]
+                      [--unity-build [N]] [--unity-exclude PATTERN]
+                      [--ignore PATTERN] [--explicit-sources]
+                      [--target NAME:TYPE[:DEPS]] [--backend {make,ninja}]
+                      [--no-compile-commands] [-o OUTPUT] [--config PATH]
+                      [--no-config] [--timings [PATH]] [-q]
 
 Generate a Makefile for your C/C++ project with customizable options.
 
@@ -12,12 +20,54 @@ Options:
   -c, --compiler <compiler>       Specify the compiler to use in the Makefile.
   -std, --standard <standard>     Specify the language standard (e.g., c11, c++17, c++20)
   --use-gui-lib                   Include GUI library flags in compilation (affects CFLAGS/LDFLAGS)
-  --binary-name <name>            Name of the output binary/executable
+  --gui-lib <sdl2|sfml|raylib>    GUI library to use, implies --use-gui-lib
+  --package <name>                Another pkg-config package (e.g. glfw3, libpng) to compile and link
+                                  with. Repeatable
+  --resolve-pkg-config            Query pkg-config while generating and write the flags into the
+                                  Makefile, so builds never start pkg-config (regenerate after
+                                  upgrading a package). Needs --target-system
+  --binary-name <name>            Name of the output binary/executable (asked for, or main in
+                                  non-interactive mode)
+  -r, --recursive                 Compile sources from every subdirectory of the source directory
+                                  (objects are mirrored under the build directory)
+  --compiler-cache <mode>         auto, ccache, sccache or none (default). Prefixes every compile with a
+                                  LAUNCHER; auto looks for ccache/sccache on PATH at build time and
+                                  falls back to a plain compile. `make cache-stats` shows the hit rate
+  --linker <linker>               auto (default), mold, lld, gold, bfd or default. Passed to the
+                                  compiler as -fuse-ld; auto picks mold, then lld, when the Makefile
+                                  is read on Linux. LINKER=... overrides it at build time
+  --pch [N]                       Precompile the N (default 8) headers included by the most sources
+                                  (written to .mkgen/mkgen_pch.h) and force-include them everywhere
+  --unity-build [N]               Compile the sources as N (default 8) unity batches in .mkgen/unity/,
+                                  balanced by size and stable when files are added or removed
+  --unity-exclude <pattern>       Glob (path or file name) of a source compiled on its own instead,
+                                  e.g. static-heavy files that clash in a batch. Repeatable
+  --ignore <pattern>              Glob (path or name, relative to the source directory) of sources or
+                                  directories left out of the build. Repeatable, implies
+                                  --explicit-sources
+  --explicit-sources              Write the list of sources into the Makefile instead of a $(wildcard)
+                                  walked at every make run (regenerate after adding or removing one)
+  --target <name:type[:deps]>     Build several targets instead of one binary: type is executable,
+                                  static or shared, sources come from <src>/<name> and deps is a
+                                  comma-separated list of libraries to link. Repeatable
+  --backend <make|ninja>          Generate a Makefile (default) or a build.ninja that lists every
+                                  source and regenerates itself when sources are added or removed
+  --no-compile-commands           Do not write compile_commands.json (written by default for
+                                  language servers, `make compdb` refreshes it)
   -o, --output <directory>        Output directory for the generated Makefile
+  --config <path>                 Project configuration to load and save (default: mkgen.toml in the
+                                  output directory). When it exists, no question is asked: the saved
+                                  settings are used and the flags given override them
+  --no-config                     Neither load nor save mkgen.toml
+  --timings [path]                Print (or write to path) the time spent in each phase as JSON:
+                                  parse, config, import, project, scan, render, write
   --target-system <system>        Target system for the Makefile (e.g., linux, windows, macos)
                                   ⚠ Mutually exclusive with --cross-platform
   --cross-platform                Generate a Makefile that works across multiple systems
                                   ⚠ Cannot be used with --target-system
+  -q, --quiet, --non-interactive  Never prompt: no banner, no delays, no output on success,
+                                  and a missing option is an error, except the binary name (main)
+                                  and the GUI library (none) (same as MKGEN_NONINTERACTIVE=1)
   -h, --help                      Show this help message and exit
 
 Interactive Mode:
@@ -42,6 +92,15 @@ Examples:
   Generate a Makefile for Linux specifically:
       mkgen generate --target-system linux --binary-name my_app
 
+  Generate a Makefile for a project with nested source folders (src/net, src/render...):
+      mkgen generate --target-system linux --recursive
+
+  Regenerate from CI or a git hook, without prompts or delays:
+      mkgen generate -q --target-system linux -l c -c gcc -std c11 --binary-name my_app
+
+  Regenerate from the mkgen.toml saved by a previous run:
+      mkgen generate
+
   Launch interactive mode (no args, or only some args provided):
       mkgen generate
       The tool will ask you to select language, compiler, etc., step by step
@@ -53,6 +112,18 @@ Usage: mkgen <command> [OPTIONS]
 
 Commands:
   generate     Generate a C/C++ Makefile for your project
+  generate-many <manifest>
+               Generate the Makefiles of every project listed in a TOML/JSON manifest
+  analyze [path]
+               Report the headers that cause the most rebuilds (fan-in, depth, cycles),
+               as a table or --json
+  report [build_dir]
+               Slowest translation units and headers of a traced build (make build-profile),
+               plus a Chrome trace of the build
+  watch [config]
+               Regenerate the Makefile of mkgen.toml (default) or the Makefiles of a manifest
+               when sources, directories or the configuration change (--make to also run make)
+  cache        Show or clear (--clear) the compiled template cache
   
 Options:
     -h, --help                      Show this help message and exit
@@ -61,10 +132,18 @@ Options:
 REQUIRE_MUTUALLY_EXCLUSIVE = '''
 usage: mkgen generate [-h] (--target-system TARGET_SYSTEM | --cross-platform)
                       [-l LANG] [-c COMPILER] [-std STANDARD] [--use-gui-lib]
-                      [--binary-name BINARY_NAME] [-o OUTPUT]
+                      [--gui-lib GUI_LIB] [--package NAME] [--resolve-pkg-config]
+                      [--binary-name BINARY_NAME] [-r]
+                      [--compiler-cache {auto,ccache,sccache,none}]
+                      [--linker {auto,mold,lld,gold,bfd,default}] [--pch [N]]
+                      [--unity-build [N]] [--unity-exclude PATTERN]
+                      [--ignore PATTERN] [--explicit-sources]
+                      [--target NAME:TYPE[:DEPS]] [--backend {make,ninja}]
+                      [--no-compile-commands] [-o OUTPUT] [--config PATH]
+                      [--no-config] [--timings [PATH]] [-q]
 mkgen generate: error: one of the arguments --target-system --cross-platform is required
 '''
 
-def show_help(help_text: str = HELP_TEXT):
-    print(help_text)
-    sys.exit(0)
\ No newline at end of file
+def show_help(help_text: str = HELP_TEXT, status: int = 0):
+    print(help_text, file=sys.stderr if status else sys.stdout)
+    sys.exit(status)
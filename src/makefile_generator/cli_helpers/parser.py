@@ -1,5 +1,7 @@
 import argparse
-from .command import generate
+
+from makefile_generator.config import COMPILER_CACHES, LINKERS
+from .command import analyze, generate, generate_many, manage_cache, report, watch
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="A simple python tool to generate C/C++ makefiles", prog="mkgen", add_help=False)
@@ -42,20 +44,289 @@ def build_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='Wether or not to include gui lib flags and or --cflags'
     )
+    generate_parser.add_argument(
+        '--gui-lib',
+        type=str,
+        help='The gui lib to use (sdl2, sfml or raylib), implies --use-gui-lib'
+    )
+    generate_parser.add_argument(
+        '--package',
+        dest='packages',
+        action='append',
+        default=[],
+        metavar='NAME',
+        help='Another pkg-config package to compile and link with (repeatable)'
+    )
+    generate_parser.add_argument(
+        '--resolve-pkg-config',
+        dest='pkg_config',
+        action='store_const',
+        const='resolve',
+        help='Run the pkg-config queries now and write their flags into the Makefile'
+    )
     generate_parser.add_argument(
         '--binary-name',
         type=str,
-        help='Specify the name of the output binary/executable. The generated Makefile will use this name for the compiled program.'
+        help='Specify the name of the output binary/executable. The generated Makefile will use this name for the compiled program (default in non-interactive mode: main)'
+    )
+    generate_parser.add_argument(
+        '-r', '--recursive',
+        action='store_true',
+        help='Find sources in every subdirectory of the source directory and mirror them under the build directory'
+    )
+    generate_parser.add_argument(
+        '--compiler-cache',
+        type=str.lower,
+        choices=COMPILER_CACHES,
+        help='Compiler launcher to put in front of every compile (auto picks ccache or sccache from PATH at build time)'
+    )
+    generate_parser.add_argument(
+        '--linker',
+        type=str.lower,
+        choices=LINKERS,
+        help='Linker to use through -fuse-ld (auto picks mold or lld at build time on Linux, default keeps the compiler\'s)'
+    )
+    generate_parser.add_argument(
+        '--pch',
+        type=int,
+        nargs='?',
+        const=8,
+        metavar='N',
+        help='Precompile the N (default 8) most included headers of the sources and force-include them in every file'
+    )
+    generate_parser.add_argument(
+        '--unity-build',
+        type=int,
+        nargs='?',
+        const=8,
+        metavar='N',
+        help='Compile the sources as N (default 8) size-balanced unity batches written to .mkgen/unity/'
+    )
+    generate_parser.add_argument(
+        '--unity-exclude',
+        action='append',
+        default=[],
+        metavar='PATTERN',
+        help='Glob of sources kept out of the unity batches and compiled on their own (repeatable)'
+    )
+    generate_parser.add_argument(
+        '--ignore',
+        action='append',
+        default=[],
+        metavar='PATTERN',
+        help='Glob of sources or directories left out of the build, implies --explicit-sources (repeatable)'
+    )
+    generate_parser.add_argument(
+        '--explicit-sources',
+        action='store_true',
+        help='List the sources in the Makefile instead of finding them with $(wildcard) at every make run'
+    )
+    generate_parser.add_argument(
+        '--target',
+        action='append',
+        default=[],
+        metavar='NAME:TYPE[:DEPS]',
+        help='Build an executable, static or shared target from src/NAME, linked with the comma-separated DEPS (repeatable)'
+    )
+    generate_parser.add_argument(
+        '--backend',
+        type=str.lower,
+        choices=['make', 'ninja'],
+        help='Build system to generate for: a Makefile (default) or a self-regenerating build.ninja'
+    )
+    generate_parser.add_argument(
+        '--no-compile-commands',
+        dest='compile_commands',
+        action='store_false',
+        help='Do not write compile_commands.json next to the Makefile'
     )
     generate_parser.add_argument(
         '-o', '--output',
         type=str,
         help='The path where the makefile will be created at (if invalid current directory will be used)'
     )
+    generate_parser.add_argument(
+        '--config',
+        type=str,
+        metavar='PATH',
+        help='Project configuration to load and save (default: mkgen.toml in the output directory)'
+    )
+    generate_parser.add_argument(
+        '--no-config',
+        action='store_true',
+        help='Neither load nor save the project configuration'
+    )
+    generate_parser.add_argument(
+        '--timings',
+        nargs='?',
+        const='-',
+        metavar='PATH',
+        help='Report the time spent parsing, loading, scanning, rendering and writing as JSON (stdout, or PATH)'
+    )
+    generate_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Never prompt, skip the banner and fail on missing options, except for the binary name (main) and the GUI library (none) (also enabled by MKGEN_NONINTERACTIVE=1)'
+    )
     generate_parser.add_argument(
         '-h', '--help',
         action='store_true',
         help='Show help'
     )
     generate_parser.set_defaults(func=generate)
+
+    many_parser = subparsers.add_parser('generate-many', help='Generate the Makefiles of every project listed in a manifest')
+    many_parser.add_argument(
+        'manifest',
+        type=str,
+        help='TOML or JSON file listing the projects (same keys as the generate options)'
+    )
+    many_parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Number of worker processes (defaults to the number of CPUs)'
+    )
+    many_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Plain output, no banner'
+    )
+    many_parser.set_defaults(func=generate_many)
+
+    analyze_parser = subparsers.add_parser('analyze', help='Report the headers that cause the most rebuilds')
+    analyze_parser.add_argument(
+        'path',
+        nargs='?',
+        default='.',
+        help='Project root (defaults to the current directory)'
+    )
+    analyze_parser.add_argument(
+        '--src',
+        default='src',
+        help='Source directory, relative to the project root'
+    )
+    analyze_parser.add_argument(
+        '--include',
+        default='include',
+        help='Include directory, relative to the project root'
+    )
+    analyze_parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        metavar='N',
+        help='Number of headers (and translation units in JSON) to report'
+    )
+    analyze_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the report as JSON on stdout'
+    )
+    analyze_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Rescan every file instead of reusing the per-file scan cache'
+    )
+    analyze_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Plain output (JSON), no banner'
+    )
+    analyze_parser.set_defaults(func=analyze)
+
+    report_parser = subparsers.add_parser('report', help='Summarize a traced build (make build-profile)')
+    report_parser.add_argument(
+        'build_dir',
+        nargs='?',
+        default='build',
+        help='Build directory of the traced build (defaults to build)'
+    )
+    report_parser.add_argument(
+        '--top',
+        type=int,
+        default=20,
+        metavar='N',
+        help='Number of translation units and headers to report'
+    )
+    report_parser.add_argument(
+        '--trace-output',
+        metavar='PATH',
+        help='Where to write the Chrome trace (defaults to <build_dir>/build-trace.json)'
+    )
+    report_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the report as JSON on stdout'
+    )
+    report_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Plain output (JSON), no banner'
+    )
+    report_parser.set_defaults(func=report)
+
+    watch_parser = subparsers.add_parser('watch', help='Regenerate the Makefiles of a manifest whenever the project layout changes')
+    watch_parser.add_argument(
+        'manifest',
+        type=str,
+        nargs='?',
+        default='mkgen.toml',
+        help='mkgen.toml of a project, or TOML or JSON manifest of the projects to keep up to date (default: mkgen.toml)'
+    )
+    watch_parser.add_argument(
+        '--make',
+        action='store_true',
+        help='Run an incremental make in each project whose Makefile was rewritten'
+    )
+    watch_parser.add_argument(
+        '--make-args',
+        nargs=argparse.REMAINDER,
+        default=[],
+        help='Arguments passed to make (must come last)'
+    )
+    watch_parser.add_argument(
+        '--debounce',
+        type=float,
+        default=0.3,
+        metavar='SECONDS',
+        help='Quiet time to wait for after a burst of changes before regenerating'
+    )
+    watch_parser.add_argument(
+        '--poll',
+        action='store_true',
+        help='Poll directory mtimes instead of using inotify'
+    )
+    watch_parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=1.0,
+        metavar='SECONDS',
+        help='Seconds between two polls (when inotify is not available or --poll is given)'
+    )
+    watch_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Plain output, no banner'
+    )
+    watch_parser.set_defaults(func=watch)
+
+    cache_parser = subparsers.add_parser('cache', help='Inspect or clear the compiled template cache')
+    cache_parser.add_argument(
+        '--clear',
+        action='store_true',
+        help='Remove every compiled template so the next run recompiles them'
+    )
+    cache_parser.add_argument(
+        '-q', '--quiet', '--non-interactive',
+        dest='non_interactive',
+        action='store_true',
+        help='Plain output, no banner'
+    )
+    cache_parser.set_defaults(func=manage_cache)
     return parser
\ No newline at end of file
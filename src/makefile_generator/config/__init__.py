@@ -1,7 +1,11 @@
 from .constants import (
     C_STANDARDS,
+    COMPILER_CACHES,
+    COMPILER_FAMILIES,
     COMPILERS,
     CPP_STANDARDS,
+    LINKERS,
+    PCH_STYLES,
     RAYLIB_CFLAGS,
     RAYLIB_FLAGS,
     SDL2_CFLAGS,
@@ -22,6 +26,10 @@ __all__ = [
     'CPP_STANDARDS',
     'C_STANDARDS',
     'COMPILERS',
+    'COMPILER_CACHES',
+    'COMPILER_FAMILIES',
+    'LINKERS',
+    'PCH_STYLES',
     'TEMPLATES_DIR',
     'TEMPLATES'
 ]
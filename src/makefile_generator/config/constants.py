@@ -36,6 +36,51 @@ COMPILERS = [
     "icpx"      # Intel oneAPI C++ Compiler
 ]
 
+# Compiler launchers the generated Makefiles can put in front of the compiler.
+# 'auto' picks ccache or sccache from PATH at build time.
+COMPILER_CACHES = [
+    "auto",
+    "ccache",
+    "sccache",
+    "none"
+]
+
+# Linkers the Makefile can ask the compiler for with -fuse-ld. auto picks mold,
+# then lld, when the Makefile is read on Linux; default never passes -fuse-ld.
+LINKERS = [
+    "auto",
+    "mold",
+    "lld",
+    "gold",
+    "bfd",
+    "default"
+]
+
+# Flag dialect of each compiler, used for the optimized build modes (LTO,
+# PGO). The Intel oneAPI compilers are LLVM based and take the clang flags.
+COMPILER_FAMILIES = {
+    "gcc": "gcc",
+    "g++": "gcc",
+    "clang": "clang",
+    "clang++": "clang",
+    "icx": "clang",
+    "icpx": "clang",
+    "cl": "msvc"
+}
+
+# How each compiler precompiles headers: GCC picks up <header>.gch next to a
+# force-included header, the clang based ones load a .pch with -include-pch,
+# and cl creates the .pch with /Yc and uses it with /Yu.
+PCH_STYLES = {
+    "gcc": "gch",
+    "g++": "gch",
+    "clang": "pch",
+    "clang++": "pch",
+    "icx": "pch",
+    "icpx": "pch",
+    "cl": "msvc"
+}
+
 SFML_FLAGS = {
     'win32': '-lsfml-graphics -lsfml-window -lsfml-audio -lsfml-system',
     'unix': '$(shell pkg-config --libs sfml-graphics)'
@@ -60,6 +105,7 @@ TEMPLATES = {
     'windows': '_WIN32.mak.j2',
     'linux': '__linux__.mak.j2',
     'mac': '__APPLE__.mak.j2',
-    'cross-platform' : 'cross-platform.mak.j2'
+    'cross-platform' : 'cross-platform.mak.j2',
+    'ninja' : 'build.ninja.j2'
 }
 
@@ -0,0 +1,331 @@
+'''
+Include-graph analysis: which headers make the most code rebuild.
+
+Every source and header under the source and include directories is scanned
+for `#include` lines, includes are resolved the way the compiler would
+(next to the including file first, then through the include and source
+directories) and the resulting graph is reduced to:
+
+- per header: transitive fan-in (how many translation units see it), rebuild
+  cost (the summed size of those translation units, fan-in x TU size) and
+  include depth (the longest chain of project headers below it),
+- per translation unit: the project headers it pulls in and their total size,
+- include cycles (strongly connected components of the graph).
+
+Includes that resolve to no project file (system and third-party headers)
+are left out. Scans are cached per file under `cache_dir()/analyze/`, keyed
+by mtime and size and confirmed by a content hash when the mtime moved, and
+the report itself is reused while no file changed.
+'''
+import hashlib
+import json
+import os
+import posixpath
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from makefile_generator import __version__
+from makefile_generator.core.includes import Include, parse_includes
+from makefile_generator.core.paths import cache_dir, env_flag
+from makefile_generator.core.scan import HEADER_EXTENSIONS, SOURCE_EXTENSIONS
+
+_CACHE_VERSION = 1
+
+
+def _walk(directory: Path, root: Path, extensions: tuple[str, ...]) -> dict[str, os.stat_result]:
+    # Plain strings and os.scandir: pathlib costs more than the scan itself
+    # on large trees.
+    prefix = len(os.path.join(str(root), ''))
+    found = {}
+    pending = [str(directory)]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif entry.name.endswith(extensions):
+                found[entry.path[prefix:].replace(os.sep, '/')] = entry.stat()
+    return found
+
+
+class _ScanCache:
+    '''Per-file include lists, reused while mtime and size (or the content hash) match.'''
+
+    def __init__(self, root: Path, enabled: bool) -> None:
+        key = hashlib.sha1(str(root.resolve()).encode()).hexdigest()[:16]
+        self.path = cache_dir() / 'analyze' / f'{key}.json'
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.report: dict[str, Any] = {}
+        if enabled:
+            try:
+                stored = json.loads(self.path.read_text())
+                if stored.get('version') == [_CACHE_VERSION, __version__]:
+                    self.entries = stored['files']
+                    self.report = stored.get('report') or {}
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def includes(self, root: Path, relative: str, stat: os.stat_result) -> list[Include]:
+        entry = self.entries.get(relative)
+        if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return [tuple(include) for include in entry['includes']]
+        try:
+            content = (root / relative).read_bytes()
+        except OSError:
+            content = b''
+        digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+        if entry and entry['hash'] == digest:
+            # Touched but not modified.
+            self.hits += 1
+            includes = [tuple(include) for include in entry['includes']]
+        else:
+            self.misses += 1
+            includes = parse_includes(content)
+        self.dirty = True
+        self.entries[relative] = {
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest,
+            'includes': includes
+        }
+        return includes
+
+    def save(self, files: Iterable[str], report: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        files = set(files)
+        self.dirty = False
+        stored = {
+            'version': [_CACHE_VERSION, __version__],
+            'files': {name: entry for name, entry in self.entries.items() if name in files},
+            'report': report
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            temporary.write_text(json.dumps(stored, separators=(',', ':')))
+            os.replace(temporary, self.path)
+        except OSError:
+            # A read-only cache directory only costs the next run a rescan.
+            pass
+
+
+def _resolver(files: dict[str, Any], search_dirs: list[str]) -> Callable[[str, Include], str | None]:
+    # Includes repeat a lot within a directory, so each (directory, include)
+    # pair is only resolved once.
+    resolved: dict[tuple[str, str, str], str | None] = {}
+
+    def resolve(includer: str, include: Include) -> str | None:
+        delimiter, name = include
+        directory = includer.rpartition('/')[0] if delimiter == '"' else ''
+        key = (directory, delimiter, name)
+        if key not in resolved:
+            candidates = [directory] if delimiter == '"' else []
+            resolved[key] = next((
+                path for path in (
+                    posixpath.normpath(posixpath.join(candidate, name))
+                    for candidate in candidates + search_dirs
+                )
+                if path in files
+            ), None)
+        return resolved[key]
+    return resolve
+
+
+def _components(graph: dict[str, list[str]]) -> list[list[str]]:
+    '''Tarjan's strongly connected components, dependencies before their includers.'''
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    for start in graph:
+        if start in index:
+            continue
+        work = [(start, iter(graph[start]))]
+        index[start] = low[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+    return components
+
+
+def _weighted_count(mask: int, weight_bits: list[int]) -> int:
+    # Sum of the weights of the members of `mask`, where weight_bits[k] holds
+    # the members whose weight has bit k set: one popcount per bit instead of
+    # a loop over the members.
+    return sum((mask & bits).bit_count() << k for k, bits in enumerate(weight_bits))
+
+
+def _weight_bits(weights: list[int]) -> list[int]:
+    bits = [0] * max(weights, default=0).bit_length()
+    for member, weight in enumerate(weights):
+        k = 0
+        while weight:
+            if weight & 1:
+                bits[k] |= 1 << member
+            weight >>= 1
+            k += 1
+    return bits
+
+
+def _build_report(
+    files: dict[str, os.stat_result],
+    sources: list[str],
+    graph: dict[str, list[str]]
+) -> dict[str, Any]:
+    # Sets of files are Python ints used as bitsets: headers are numbered for
+    # the forward closures (what a file pulls in), translation units for the
+    # reverse ones (who sees a header), so unions are single ORs on the
+    # component DAG instead of per-file loops.
+    components = _components(graph)
+    component_of = {node: number for number, component in enumerate(components) for node in component}
+    headers = sorted(name for name in files if name.endswith(HEADER_EXTENSIONS))
+    header_bit = {name: 1 << number for number, name in enumerate(headers)}
+    header_sizes = _weight_bits([files[name].st_size for name in headers])
+
+    # Forward: closures and depths, dependencies are always done first.
+    children: list[set[int]] = [set() for _ in components]
+    closures: list[int] = []
+    depths: list[int] = []
+    for number, component in enumerate(components):
+        closure = 0
+        depth = 0
+        for node in component:
+            closure |= header_bit.get(node, 0)
+            children[number].update(component_of[child] for child in graph[node])
+        children[number].discard(number)
+        for child in children[number]:
+            closure |= closures[child]
+            depth = max(depth, depths[child] + 1)
+        closures.append(closure)
+        depths.append(depth)
+
+    units = []
+    for source in sources:
+        closure = closures[component_of[source]]
+        units.append({
+            'path': source,
+            'headers': closure.bit_count(),
+            'size': files[source].st_size + _weighted_count(closure, header_sizes),
+            'depth': depths[component_of[source]]
+        })
+    unit_sizes = _weight_bits([unit['size'] for unit in units])
+
+    # Reverse: translation units seeing each component, includers first.
+    seen_by = [0] * len(components)
+    for number, source in enumerate(sources):
+        seen_by[component_of[source]] |= 1 << number
+    for number in reversed(range(len(components))):
+        for child in children[number]:
+            seen_by[child] |= seen_by[number]
+
+    direct_fan_in = dict.fromkeys(headers, 0)
+    for source in sources:
+        for name in set(graph[source]):
+            if name in direct_fan_in:
+                direct_fan_in[name] += 1
+
+    header_rows = []
+    for name in headers:
+        component = component_of[name]
+        header_rows.append({
+            'path': name,
+            'fan_in': seen_by[component].bit_count(),
+            'direct_fan_in': direct_fan_in[name],
+            'rebuild_cost': _weighted_count(seen_by[component], unit_sizes),
+            'depth': depths[component],
+            'size': files[name].st_size
+        })
+    header_rows.sort(key=lambda row: (-row['rebuild_cost'], -row['fan_in'], row['path']))
+    units.sort(key=lambda row: (-row['size'], row['path']))
+    cycles = [
+        component for component in components
+        if len(component) > 1 or component[0] in graph[component[0]]
+    ]
+    return {
+        'sources': len(sources),
+        'headers': len(headers),
+        'edges': sum(len(children) for children in graph.values()),
+        'header_costs': header_rows,
+        'translation_units': units,
+        'cycles': cycles
+    }
+
+
+def analyze(root: Path, src: str = 'src', include: str = 'include', use_cache: bool = True) -> dict[str, Any]:
+    '''
+    Analyze the include graph of the project in `root`. Returns a JSON-ready
+    report; nothing here prints. Raises FileNotFoundError when neither
+    directory exists.
+    '''
+    root = Path(os.path.abspath(root))
+    search_dirs = list(dict.fromkeys(
+        Path(os.path.normpath(directory)).as_posix() for directory in (include, src)
+    ))
+    if not any((root / directory).is_dir() for directory in search_dirs):
+        raise FileNotFoundError(f"neither '{src}' nor '{include}' exists in {root}")
+
+    files: dict[str, os.stat_result] = {}
+    for directory in search_dirs:
+        if (root / directory).is_dir():
+            files.update(_walk(root / directory, root, SOURCE_EXTENSIONS + HEADER_EXTENSIONS))
+    sources = sorted(name for name in files if name.endswith(SOURCE_EXTENSIONS))
+
+    cache = _ScanCache(root, use_cache and not env_flag('MKGEN_NO_CACHE'))
+    includes = {name: cache.includes(root, name, files[name]) for name in sorted(files)}
+    fingerprint = hashlib.sha1(json.dumps(
+        [search_dirs, [(name, cache.entries[name]['hash']) for name in sorted(files)]]
+    ).encode()).hexdigest()
+
+    if cache.report.get('fingerprint') == fingerprint:
+        report = cache.report
+    else:
+        resolve = _resolver(files, search_dirs)
+        graph = {
+            name: [resolved for resolved in (resolve(name, item) for item in items) if resolved is not None]
+            for name, items in includes.items()
+        }
+        report = _build_report(files, sources, graph)
+        report['fingerprint'] = fingerprint
+    if cache.dirty or report is not cache.report or len(cache.entries) != len(files):
+        cache.save(files, report)
+    return {
+        **{key: value for key, value in report.items() if key != 'fingerprint'},
+        'root': str(root),
+        'cache': {'hits': cache.hits, 'misses': cache.misses}
+    }
@@ -0,0 +1,83 @@
+'''
+Render and write many projects at once through a process pool.
+
+Each worker keeps its own template environment (and shares the on-disk
+bytecode cache), so the per-project cost is one render and one write.
+'''
+import os
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal
+
+from makefile_generator.core.render import render_files, write_if_changed
+from makefile_generator.core.templates import cache_stats
+
+Status = Literal['written', 'unchanged', 'failed']
+
+
+@dataclass
+class BatchResult:
+    output: str
+    status: Status
+    message: str = ''
+    cache: dict[str, int] = field(default_factory=dict)
+
+
+def generate_project(project: Mapping[str, Any]) -> BatchResult:
+    output = str(project.get('output', '.'))
+    before = cache_stats()
+    try:
+        root = Path(output)
+        if not root.is_dir():
+            raise FileNotFoundError(f'Output directory does not exist: {root}')
+        files = render_files(project, root)
+        written = [write_if_changed(root / name, content) for name, content in files.items()]
+        status: Status = 'written' if any(written) else 'unchanged'
+        message = ''
+    except (ValueError, OSError) as e:
+        status, message = 'failed', str(e)
+    except Exception as e:
+        # One malformed project must not take the rest of the manifest down.
+        status, message = 'failed', f'{type(e).__name__}: {e}'
+    after = cache_stats()
+    return BatchResult(output, status, message, {key: after[key] - before[key] for key in after})
+
+
+def generate_many(
+    projects: list[Mapping[str, Any]],
+    jobs: int | None = None,
+    on_result: Callable[[BatchResult], None] | None = None
+) -> list[BatchResult]:
+    '''Generate every project, in manifest order. `jobs` defaults to the CPU count.'''
+    jobs = jobs or os.cpu_count() or 1
+    results: Iterable[BatchResult]
+    if jobs == 1 or len(projects) < 2:
+        results = map(generate_project, projects)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(projects)))
+        chunksize = max(1, len(projects) // (jobs * 4))
+        results = pool.map(generate_project, projects, chunksize=chunksize)
+    collected = []
+    try:
+        for result in results:
+            if on_result:
+                on_result(result)
+            collected.append(result)
+    finally:
+        if pool:
+            pool.shutdown()
+    return collected
+
+
+def summarize(results: list[BatchResult]) -> dict[str, Any]:
+    summary: dict[str, Any] = {'written': 0, 'unchanged': 0, 'failed': 0}
+    cache: dict[str, int] = {}
+    for result in results:
+        summary[result.status] += 1
+        for key, value in result.cache.items():
+            cache[key] = cache.get(key, 0) + value
+    summary['template_cache'] = cache
+    return summary
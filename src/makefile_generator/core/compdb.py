@@ -0,0 +1,73 @@
+'''
+Compilation database (compile_commands.json) for language servers.
+
+Written by mkgen next to the Makefile from the same data the Makefile is
+rendered from, so clangd and friends work without a `bear -- make` rebuild.
+The commands are the ones of the default build (MODE=release); `make compdb`
+rewrites the file from the Makefile itself for another MODE or after adding
+sources without regenerating.
+'''
+import json
+import shlex
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.core.packages import resolve_shell
+from makefile_generator.core.scan import project_sources
+
+COMPDB_NAME = 'compile_commands.json'
+# The Makefiles' `MODE ?=`, whose objects go to $(BUILD_ROOT)/<mode>.
+DEFAULT_MODE = 'release'
+
+
+def _flags(data: Mapping[str, Any]) -> list[str]:
+    compiler = data['compiler']
+    flags = [
+        f'-std={compiler["std"]}',
+        '-Wall',
+        '-Werror',
+        f'-I{data["directories"]["include"]}',
+        '-O2',
+        '-DNDEBUG'
+    ]
+    if data.get('use_gui_lib'):
+        flags += shlex.split(resolve_shell(data['gui_lib_cflags']))
+    return flags
+
+
+def _planned_sources(root: Path, data: Mapping[str, Any]) -> list[tuple[Path, bool]]:
+    # (source, compiled for a shared library), in the Makefile's target order.
+    if not data.get('targets'):
+        return [(source, False) for source in project_sources(root, data)]
+    return [
+        (source, target['pic'])
+        for target in data['targets']
+        for source in project_sources(root, data, target['dir'], target['exclude'])
+    ]
+
+
+def compile_commands(root: Path, data: Mapping[str, Any], system: str = 'linux') -> list[dict[str, Any]]:
+    '''One entry per source of the project, in the Makefile's file order.'''
+    directories = data['directories']
+    src_dir = root / directories['src']
+    build_dir = Path(directories['build']) / DEFAULT_MODE
+    directory = str(root.resolve())
+    flags = _flags(data)
+    # Same as the Makefiles' PIC_FLAGS: DLLs need no -fPIC.
+    pic = [] if system == 'windows' else ['-fPIC']
+    entries = []
+    for source, shared in _planned_sources(root, data):
+        relative = source.relative_to(root).as_posix()
+        output = (build_dir / source.relative_to(src_dir)).with_suffix('.o').as_posix()
+        compile_output = ['/c', f'/Fo{output}'] if data['compiler']['name'] == 'cl' else ['-c', '-o', output]
+        entries.append({
+            'directory': directory,
+            'file': relative,
+            'command': shlex.join([data['compiler']['name'], *flags, *(pic if shared else []), *compile_output, relative])
+        })
+    return entries
+
+
+def compdb_file(root: Path, data: Mapping[str, Any], system: str = 'linux') -> str:
+    return json.dumps(compile_commands(root, data, system), indent=2) + '\n'
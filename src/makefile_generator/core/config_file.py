@@ -0,0 +1,99 @@
+'''
+Per-project configuration file, `mkgen.toml`.
+
+`mkgen generate` saves the resolved project description (see core.project)
+next to the Makefile. Later runs load it, apply the command-line flags on
+top and render right away, without prompts:
+
+    # Generated by mkgen, edit freely: `mkgen generate` rebuilds from it.
+    target_system = "linux"
+    lang = "c"
+    output_file = "app"
+    recursive = true
+
+    [compiler]
+    name = "gcc"
+    std = "c11"
+
+    [directories]
+    src = "src"
+    ...
+'''
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.core.manifest import load_toml
+from makefile_generator.core.project import DEFAULT_DIRECTORIES
+
+CONFIG_NAME = 'mkgen.toml'
+
+# Saved in this order; anything else a description holds is kept after them.
+_KEYS = [
+    'target_system', 'cross_platform', 'lang', 'output_file', 'gui_lib', 'packages', 'pkg_config',
+    'recursive', 'backend', 'compiler_cache', 'linker', 'pch', 'unity_build', 'unity_exclude',
+    'ignore', 'explicit_sources', 'compile_commands'
+]
+_TABLES = ['compiler', 'directories']
+_KNOWN = {*_KEYS, *_TABLES, 'targets', 'standard'}
+
+
+def load_config(path: Path) -> dict[str, Any]:
+    '''Read a mkgen.toml; raises FileNotFoundError or ValueError.'''
+    content = load_toml(path)
+    if 'projects' in content:
+        raise ValueError(f"{path}: this is a batch manifest, use 'mkgen generate-many' with it")
+    unknown = sorted(set(content) - _KNOWN)
+    if unknown:
+        raise ValueError(f"{path}: unknown keys: {', '.join(unknown)}")
+    return content
+
+
+def _value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, Mapping):
+        return '{ ' + ', '.join(f'{_key(key)} = {_value(item)}' for key, item in value.items()) + ' }'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(_value(item) for item in value) + ']'
+    # JSON strings are valid TOML basic strings.
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def _key(key: str) -> str:
+    return key if key.replace('_', '').replace('-', '').isalnum() else json.dumps(key)
+
+
+def _clean(project: Mapping[str, Any]) -> dict[str, Any]:
+    # TOML has no null, and empty or false optional settings are the defaults anyway.
+    return {
+        key: value for key, value in project.items()
+        if value is not None and value != [] and not (key == 'cross_platform' and value is False)
+        and key not in ('output', 'use_gui_lib')
+    }
+
+
+def dump_config(project: Mapping[str, Any]) -> str:
+    '''The mkgen.toml text of a project description.'''
+    project = _clean(project)
+    if project.get('cross_platform'):
+        project.pop('target_system', None)
+    project['directories'] = {**DEFAULT_DIRECTORIES, **(project.get('directories') or {})}
+    lines = ['# Generated by mkgen, edit freely: `mkgen generate` rebuilds from it.']
+    plain = [key for key in _KEYS if key in project]
+    plain += sorted(
+        key for key in project
+        if key not in _KEYS + ['targets'] and not (key in _TABLES and isinstance(project[key], Mapping))
+    )
+    lines += [f'{_key(key)} = {_value(project[key])}' for key in plain]
+    for table in _TABLES:
+        if isinstance(project.get(table), Mapping):
+            lines += ['', f'[{table}]']
+            lines += [f'{_key(key)} = {_value(value)}' for key, value in _clean(project[table]).items()]
+    for target in project.get('targets') or []:
+        lines += ['', '[[targets]]']
+        lines += [f'{_key(key)} = {_value(value)}' for key, value in _clean(target).items()]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,62 @@
+'''
+`#include` scanning, done at generation time.
+'''
+import re
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+_INCLUDE_RE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\r\n]+)[>"]', re.MULTILINE)
+# Includes plus the directives opening and closing a conditional block.
+_DIRECTIVE_RE = re.compile(
+    rb'^[ \t]*#[ \t]*(?:include[ \t]*([<"])([^>"\r\n]+)[>"]|(if|ifdef|ifndef|endif)\b)',
+    re.MULTILINE
+)
+
+# An include as written in the source: ('<', 'vector') or ('"', 'net/socket.h').
+Include = tuple[str, str]
+
+
+def parse_includes(content: bytes) -> list[Include]:
+    return [
+        (delimiter.decode(), name.decode(errors='replace').strip())
+        for delimiter, name in _INCLUDE_RE.findall(content)
+    ]
+
+
+def parse_unconditional_includes(content: bytes) -> list[Include]:
+    '''The includes outside of any #if/#ifdef/#ifndef block (always compiled in).'''
+    includes, depth = [], 0
+    for delimiter, name, conditional in _DIRECTIVE_RE.findall(content):
+        if conditional == b'endif':
+            depth = max(depth - 1, 0)
+        elif conditional:
+            depth += 1
+        elif depth == 0:
+            includes.append((delimiter.decode(), name.decode(errors='replace').strip()))
+    return includes
+
+
+def scan_includes(path: Path, unconditional: bool = False) -> list[Include]:
+    try:
+        content = path.read_bytes()
+    except OSError:
+        return []
+    return parse_unconditional_includes(content) if unconditional else parse_includes(content)
+
+
+def format_include(include: Include) -> str:
+    delimiter, name = include
+    return f'<{name}>' if delimiter == '<' else f'"{name}"'
+
+
+def rank_includes(sources: Iterable[Path]) -> list[tuple[Include, int]]:
+    '''
+    Direct fan-in of every include: how many sources include it, most
+    included first. Includes under a preprocessor conditional are left out,
+    they may not compile everywhere the ranked headers end up.
+    '''
+    fan_in: Counter[Include] = Counter()
+    for source in sources:
+        fan_in.update(set(scan_includes(source, unconditional=True)))
+    return sorted(fan_in.items(), key=lambda item: (-item[1], item[0][1]))
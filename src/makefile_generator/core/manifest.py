@@ -0,0 +1,70 @@
+'''
+Batch manifests: a list of project descriptions (see core.project), in TOML
+or JSON.
+
+    [defaults]
+    target_system = "linux"
+    lang = "c"
+    compiler = { name = "gcc", std = "c11" }
+
+    [[projects]]
+    output = "libs/net"
+    output_file = "net"
+
+    [[projects]]
+    output = "apps/viewer"
+    output_file = "viewer"
+    gui_lib = "sdl2"
+
+`defaults` is deep-merged under every project, `output` is the directory that
+receives the Makefile, relative to the manifest. A JSON manifest may also be
+a bare list of projects.
+'''
+import json
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.core.project import merge_projects
+
+
+def load_toml(path: Path) -> dict[str, Any]:
+    try:
+        import tomllib
+    except ModuleNotFoundError: # Python 3.10
+        try:
+            import tomli as tomllib # type: ignore
+        except ModuleNotFoundError:
+            raise ValueError(f'{path}: reading TOML needs Python 3.11+ or the tomli package') from None
+    with open(path, 'rb') as file:
+        try:
+            return tomllib.load(file)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f'{path}: {e}') from None
+
+
+def load_json(path: Path) -> Any:
+    with open(path, encoding='utf-8') as file:
+        try:
+            return json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'{path}: {e}') from None
+
+
+def load_manifest(path: Path) -> list[dict[str, Any]]:
+    '''Read a manifest and return its projects with defaults applied and `output` made absolute.'''
+    content = load_toml(path) if path.suffix.lower() == '.toml' else load_json(path)
+    if isinstance(content, list):
+        content = {'projects': content}
+    if not isinstance(content, dict) or not isinstance(content.get('projects'), list):
+        raise ValueError(f"{path}: expected a 'projects' list")
+
+    defaults = content.get('defaults') or {}
+    root = path.resolve().parent
+    projects = []
+    for index, entry in enumerate(content['projects']):
+        if not isinstance(entry, dict):
+            raise ValueError(f'{path}: project #{index + 1} is not a table/object')
+        project = merge_projects(defaults, entry)
+        project['output'] = str(root / project.get('output', '.'))
+        projects.append(project)
+    return projects
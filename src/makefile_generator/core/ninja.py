@@ -0,0 +1,191 @@
+'''
+Ninja backend: the data behind build.ninja.
+
+Ninja has no globbing and no conditionals, so everything make works out
+while reading the Makefile (source lists, the host platform, pkg-config
+flags, the compiler cache) is settled here, at generation time. In return a
+no-op build is a stat of every file and nothing else.
+
+build.ninja regenerates itself through mkgen whenever a source directory
+changes (a file added, removed or renamed), from the project description
+saved in .mkgen/ninja.json. Both configurations are in the same file, each
+with its release/ or debug/ subdirectory of the build and bin directories,
+like the Makefiles; ninja notices changed flags by itself (it compares the
+command lines).
+'''
+import json
+import shutil
+import subprocess
+import sys
+from collections.abc import Mapping
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.core.packages import resolve_shell
+from makefile_generator.core.scan import project_sources
+
+NINJA_FILE = 'build.ninja'
+NINJA_MANIFEST = '.mkgen/ninja.json'
+MODES = {
+    'release': '-O2 -s -DNDEBUG',
+    'debug': '-g -DDEBUG'
+}
+
+
+def _escape(path: str) -> str:
+    return path.replace('$', '$$').replace(' ', '$ ').replace(':', '$:')
+
+
+def _host_system() -> str:
+    if sys.platform == 'win32':
+        return 'windows'
+    return 'mac' if sys.platform == 'darwin' else 'linux'
+
+
+def generated_for(project: Mapping[str, Any]) -> str:
+    '''The system files generated here build for: the target system, or this machine for a cross-platform project.'''
+    return _host_system() if project.get('cross_platform') else str(project['target_system']).lower()
+
+
+def _launcher(compiler_cache: str) -> str:
+    if compiler_cache == 'auto':
+        return next((tool for tool in ('ccache', 'sccache') if shutil.which(tool)), '')
+    return compiler_cache if compiler_cache in ('ccache', 'sccache') else ''
+
+
+@cache
+def _can_link_with(compiler: str, linker: str) -> bool:
+    try:
+        completed = subprocess.run(
+            [compiler, f'-fuse-ld={linker}', '-Wl,--version'], capture_output=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return completed.returncode == 0
+
+
+def _linker(linker: str, system: str, compiler: Mapping[str, Any]) -> str:
+    # What the Makefiles work out when they are read, see their LINKER.
+    if compiler['family'] == 'msvc' or linker == 'default':
+        return ''
+    if linker != 'auto':
+        return linker
+    if system != 'linux':
+        return ''
+    return next((candidate for candidate in ('mold', 'lld') if _can_link_with(compiler['name'], candidate)), '')
+
+
+def _naming(system: str, compiler: str) -> dict[str, str]:
+    # Same layout as the Makefiles' EXECUTABLE/STATIC_LIB/SHARED_LIB.
+    if system == 'windows':
+        if compiler == 'cl':
+            return {'executable': '{}.exe', 'static': '{}.lib', 'shared': '{}.dll', 'import': '{}.lib', 'rpath': '', 'pic': ''}
+        return {'executable': '{}.exe', 'static': 'lib{}.a', 'shared': '{}.dll', 'import': '', 'rpath': '', 'pic': ''}
+    if system == 'mac':
+        return {'executable': '{}', 'static': 'lib{}.a', 'shared': 'lib{}.dylib', 'import': '', 'rpath': '-Wl,-rpath,@loader_path', 'pic': '-fPIC'}
+    return {'executable': '{}', 'static': 'lib{}.a', 'shared': 'lib{}.so', 'import': '', 'rpath': "-Wl,-rpath,'$$ORIGIN'", 'pic': '-fPIC'}
+
+
+def _compile_list(root: Path, data: Mapping[str, Any], sources: list[Path]) -> list[list[str]]:
+    src_dir = root / data['directories']['src']
+    return [
+        [_escape(source.relative_to(root).as_posix()), _escape(source.relative_to(src_dir).with_suffix('.o').as_posix())]
+        for source in sources
+    ]
+
+
+def _source_dirs(root: Path, data: Mapping[str, Any]) -> list[str]:
+    # Adding or removing a file changes its directory's mtime, which is what
+    # build.ninja's regeneration edge depends on.
+    src_dir = root / data['directories']['src']
+    if not src_dir.is_dir():
+        return []
+    directories = {src_dir}
+    # Without 'recursive', each target still reads its own directory.
+    directories.update(src_dir / target['dir'] for target in data.get('targets') or () if target['dir'] != '.')
+    if data.get('recursive'):
+        directories.update(path for path in src_dir.rglob('*') if path.is_dir())
+    return [_escape(path.relative_to(root).as_posix()) for path in sorted(directories) if path.is_dir()]
+
+
+def plan_ninja(root: Path, data: Mapping[str, Any], project: Mapping[str, Any]) -> dict[str, Any]:
+    '''The `ninja` entry of the template data (see build.ninja.j2).'''
+    if project.get('pch'):
+        raise ValueError("'pch' is not supported by the ninja backend yet")
+    # A cross-platform build.ninja is generated for the machine it is
+    # generated on (and regenerates itself on each machine).
+    system = generated_for(project)
+    compiler = data['compiler']['name']
+    naming = _naming(system, compiler)
+
+    if data.get('targets'):
+        planned = [
+            (target, project_sources(root, data, target['dir'], target['exclude']))
+            for target in data['targets']
+        ]
+    else:
+        main = {'name': data['output_file'], 'kind': 'executable', 'libs': [], 'pic': False}
+        if data.get('unity'):
+            unity = data['unity']
+            src_dir = root / data['directories']['src']
+            sources = [src_dir / name for name in unity['excluded']]
+            batches = [[_escape(f'{unity["dir"]}/{name}'), _escape(f'.unity/{Path(name).with_suffix(".o")}')] for name in unity['batches']]
+        else:
+            sources = project_sources(root, data)
+            batches = []
+        planned = [(main, sources)]
+
+    outputs = {target['name']: naming[target['kind']].format(target['name']) for target, _ in planned}
+    kinds = {target['name']: target['kind'] for target, _ in planned}
+    targets = []
+    for target, sources in planned:
+        objects = _compile_list(root, data, sources)
+        if not data.get('targets'):
+            objects += batches
+        targets.append({
+            'name': target['name'],
+            'kind': target['kind'],
+            'output': _escape(outputs[target['name']]),
+            'import': _escape(naming['import'].format(target['name'])) if target['kind'] == 'shared' and naming['import'] else '',
+            'objects': objects,
+            'libs': [_escape(outputs[lib]) for lib in target['libs']],
+            'link': [
+                _escape((naming['import'] if kinds[lib] == 'shared' and naming['import'] else outputs[lib]).format(lib))
+                for lib in target['libs']
+            ],
+            'pic': naming['pic'] if target['pic'] else ''
+        })
+
+    gui_cflags = gui_libs = ''
+    if data.get('use_gui_lib'):
+        gui_cflags = resolve_shell(data['gui_lib_cflags']) if system != 'windows' else ''
+        gui_libs = resolve_shell(data['unix_gui_lib_flags'] if 'unix_gui_lib_flags' in data and system != 'windows' else data['gui_lib_flags'])
+    linker = _linker(data.get('linker', 'auto'), system, data['compiler'])
+    modes = dict(MODES)
+    mode_ldflags = {mode: '' for mode in MODES}
+    if system == 'linux' and data['compiler']['family'] != 'msvc':
+        # Debug info stays in .dwo files next to the objects instead of being relinked.
+        modes['debug'] += ' -gsplit-dwarf'
+        if linker in ('gold', 'lld', 'mold'):
+            mode_ldflags['debug'] = '-Wl,--gdb-index'
+    executables = [target for target in targets if target['kind'] == 'executable']
+    return {
+        'system': system,
+        'launcher': _launcher(data.get('compiler_cache', 'none')),
+        'gui_cflags': gui_cflags,
+        'gui_libs': gui_libs,
+        'rpath': naming['rpath'],
+        'ldflags': f'-fuse-ld={linker}' if linker else '',
+        'modes': modes,
+        'mode_ldflags': mode_ldflags,
+        'targets': targets,
+        'main': next((target for target in executables if target['name'] == data['output_file']), executables[0] if executables else None),
+        'manifest': NINJA_MANIFEST,
+        'source_dirs': _source_dirs(root, data)
+    }
+
+
+def ninja_manifest(project: Mapping[str, Any]) -> str:
+    '''The description build.ninja regenerates itself from (a one-project batch manifest).'''
+    return json.dumps([{**project, 'output': '..'}], indent=2, sort_keys=True) + '\n'
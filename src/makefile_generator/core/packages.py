@@ -0,0 +1,136 @@
+'''
+Libraries found through pkg-config: the GUI libraries and any other package
+a project links.
+
+    'gui_lib': 'sdl2',
+    'packages': ['glfw3', 'libpng'],
+    'pkg_config': 'resolve'              # or 'make' (default)
+
+With 'make' the Makefile queries pkg-config into simply-expanded variables
+when it is read, once per make run. With 'resolve' mkgen runs the queries at
+generation time and writes the flags themselves, so a build starts no
+pkg-config process at all; `mkgen generate` picks up an upgraded package.
+A query that fails here (tool or package missing) stays a make-time query.
+
+More libraries can be registered, e.g. by a tool embedding mkgen:
+
+    register_package('vulkan', windows='-lvulkan-1')
+'''
+import re
+import shlex
+import shutil
+import subprocess
+from collections.abc import Iterable
+from functools import cache
+
+from makefile_generator.config import (
+    RAYLIB_CFLAGS,
+    RAYLIB_FLAGS,
+    SDL2_CFLAGS,
+    SDL2_FLAGS,
+    SFML_CFLAGS,
+    SFML_FLAGS
+)
+
+PKG_CONFIG_MODES = ['make', 'resolve']
+
+# name -> link flags on Windows ('win32') and elsewhere ('unix'), compile flags.
+PACKAGES: dict[str, dict[str, str]] = {
+    'sfml': {**SFML_FLAGS, 'cflags': SFML_CFLAGS},
+    'sdl2': {**SDL2_FLAGS, 'cflags': SDL2_CFLAGS},
+    'raylib': {**RAYLIB_FLAGS, 'cflags': RAYLIB_CFLAGS},
+}
+
+_MODULE_RE = re.compile(r'^[A-Za-z0-9_.+-]+$')
+_SHELL_RE = re.compile(r'\$\(shell ([^()]*)\)')
+
+
+def _query(module: str, what: str) -> str:
+    return f'$(shell pkg-config --{what} {module})'
+
+
+def register_package(name: str, module: str | None = None, *, windows: str | None = None) -> None:
+    '''
+    Make `name` usable in 'packages'. `module` is its pkg-config name (the
+    name itself by default) and `windows` its link flags on Windows, where
+    pkg-config is rarely around (-l<name> by default).
+    '''
+    PACKAGES[name] = _module_flags(name, module or name, windows)
+
+
+def _module_flags(name: str, module: str, windows: str | None = None) -> dict[str, str]:
+    if not _MODULE_RE.match(name) or not _MODULE_RE.match(module):
+        raise ValueError(f"'{module}' is not a valid pkg-config package name")
+    return {
+        'win32': windows if windows is not None else f'-l{module.removeprefix("lib")}',
+        'unix': _query(module, 'libs'),
+        'cflags': _query(module, 'cflags')
+    }
+
+
+def package_flags(name: str) -> dict[str, str]:
+    '''
+    The flags of a package; unregistered names are taken as pkg-config
+    modules (without registering them, generating never changes PACKAGES).
+    '''
+    if name in PACKAGES:
+        return PACKAGES[name]
+    return _module_flags(name, name)
+
+
+@cache
+def _shell_output(command: str) -> str | None:
+    # Run like make's $(shell ...) would; None when the tool or the package is missing.
+    if not shutil.which(shlex.split(command)[0]):
+        return None
+    try:
+        completed = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def clear_shell_cache() -> None:
+    '''Forget the pkg-config answers, for long-running processes where packages come and go.'''
+    _shell_output.cache_clear()
+
+
+def resolve_shell(flags: str, keep_failed: bool = False) -> str:
+    '''
+    Replace the `$(shell ...)` calls of make-style flags with their output.
+    A call that fails is dropped, or kept as it is with `keep_failed`.
+    '''
+    def replace(match: re.Match) -> str:
+        output = _shell_output(match.group(1))
+        if output is None:
+            return match.group(0) if keep_failed else ''
+        return output
+    return ' '.join(_SHELL_RE.sub(replace, flags).split())
+
+
+def library_flags(
+    libs: Iterable[str], target_system: str | None, cross_platform: bool, resolve: bool = False
+) -> dict[str, str]:
+    '''
+    Template data for the libraries of a project: gui_lib_flags (the link
+    flags, the Windows ones in a cross-platform Makefile), unix_gui_lib_flags
+    (cross-platform only) and gui_lib_cflags.
+    '''
+    packages = [package_flags(lib) for lib in libs]
+
+    def joined(key: str) -> str:
+        flags = ' '.join(package[key] for package in packages if package[key])
+        return resolve_shell(flags, keep_failed=True) if resolve else flags
+
+    if cross_platform:
+        if resolve:
+            raise ValueError("'pkg_config = resolve' needs a target_system, a cross-platform Makefile queries each machine")
+        return {
+            'gui_lib_flags': joined('win32'),
+            'unix_gui_lib_flags': joined('unix'),
+            'gui_lib_cflags': joined('cflags')
+        }
+    return {
+        'gui_lib_flags': joined('win32' if target_system == 'windows' else 'unix'),
+        'gui_lib_cflags': joined('cflags')
+    }
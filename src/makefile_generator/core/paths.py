@@ -0,0 +1,24 @@
+import os
+import sys
+from pathlib import Path
+
+
+def env_flag(name: str) -> bool:
+    '''Whether the environment variable `name` is set to something other than 0/false/no/off.'''
+    return os.environ.get(name, '').strip().lower() not in ('', '0', 'false', 'no', 'off')
+
+
+def cache_dir() -> Path:
+    '''
+    Root of mkgen's persistent caches.
+
+    MKGEN_CACHE_DIR wins, then $XDG_CACHE_HOME/mkgen (%LOCALAPPDATA%\\mkgen on
+    Windows), then ~/.cache/mkgen.
+    '''
+    override = os.environ.get('MKGEN_CACHE_DIR')
+    if override:
+        return Path(override)
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base and sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA')
+    return Path(base or Path.home() / '.cache') / 'mkgen'
@@ -0,0 +1,74 @@
+'''
+Precompiled header planning.
+
+The most included headers of the project are gathered into one umbrella
+header, `.mkgen/mkgen_pch.h`, which the generated Makefile precompiles and
+force-includes in every translation unit.
+'''
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.config import PCH_STYLES
+from makefile_generator.core.includes import format_include, rank_includes
+from makefile_generator.core.scan import project_sources
+
+PCH_DIR = '.mkgen'
+PCH_NAME = 'mkgen_pch'
+DEFAULT_PCH_HEADERS = 8
+
+
+def _reachable(include: tuple[str, str], include_dir: Path) -> bool:
+    # The umbrella header lives in .mkgen/, so quoted includes only work when
+    # they resolve through the include directory. Angle includes are left to
+    # the compiler's search path (system headers).
+    delimiter, name = include
+    return delimiter == '<' or (include_dir / name).is_file()
+
+
+def plan_pch(root: Path, data: Mapping[str, Any], max_headers: int = DEFAULT_PCH_HEADERS) -> dict[str, Any] | None:
+    '''
+    Pick the headers worth precompiling: included by at least two sources,
+    ranked by fan-in, at most `max_headers` of them. None when the compiler
+    cannot precompile headers or no header is shared.
+    '''
+    style = PCH_STYLES.get(data['compiler']['name'].lower())
+    if not style:
+        return None
+    directories = data['directories']
+    sources = project_sources(root, data)
+    include_dir = root / directories['include']
+    ranked = [
+        (include, fan_in) for include, fan_in in rank_includes(sources)
+        if fan_in >= 2 and _reachable(include, include_dir)
+    ][:max_headers]
+    if not ranked:
+        return None
+
+    lang = 'c' if data['src_ext'] == '.c' else 'c++'
+    return {
+        'style': style,
+        'dir': PCH_DIR,
+        'name': PCH_NAME,
+        'header': f'{PCH_DIR}/{PCH_NAME}.h',
+        'stub': f'{PCH_DIR}/{PCH_NAME}{data["src_ext"]}',
+        'lang': lang,
+        'headers': [format_include(include) for include, _ in ranked],
+        'fan_in': {format_include(include): fan_in for include, fan_in in ranked},
+        'sources': len(sources)
+    }
+
+
+def pch_files(plan: Mapping[str, Any]) -> dict[str, str]:
+    '''Files to write next to the Makefile for a plan returned by plan_pch.'''
+    lines = [
+        '/* Generated by mkgen: the most included headers of this project, precompiled once.',
+        ' * Regenerate the Makefile to refresh this list. */',
+        '',
+    ]
+    lines += [f'#include {header} /* included by {plan["fan_in"][header]} of {plan["sources"]} sources */' for header in plan['headers']]
+    files = {plan['header']: '\n'.join(lines) + '\n'}
+    if plan['style'] == 'msvc':
+        # cl builds the .pch while compiling a source file that includes the header (/Yc).
+        files[plan['stub']] = f'#include "{plan["name"]}.h"\n'
+    return files
@@ -0,0 +1,223 @@
+'''
+Turns a project description into the data model the templates render.
+
+A project is a plain mapping shaped like the template data itself, so it can
+come from the interactive prompts, a batch manifest or a config file:
+
+    {
+        'target_system': 'linux',        # or 'cross_platform': True
+        'lang': 'c',
+        'compiler': {'name': 'gcc', 'std': 'c11'},
+        'output_file': 'main',
+        'directories': {'src': 'src', 'include': 'include'},
+        'gui_lib': 'sdl2',               # optional
+        'recursive': False,
+        'compiler_cache': 'auto',        # auto, ccache, sccache or none
+        'linker': 'auto',                # auto (mold, lld), mold, lld, gold, bfd or default
+        'pch': 8,                        # optional, headers to precompile
+        'unity_build': 8,                # optional, unity batches
+        'unity_exclude': ['legacy/*'],   # sources kept out of the batches
+        'ignore': ['third_party/*'],     # sources left out, see core.scan
+        'explicit_sources': False,       # list the sources instead of $(wildcard)
+        'compile_commands': True,        # write compile_commands.json (default)
+        'targets': [...],                # optional, see core.targets
+        'backend': 'make',               # or 'ninja' (build.ninja)
+        'packages': ['glfw3'],           # more pkg-config libraries, see core.packages
+        'pkg_config': 'make'             # or 'resolve' (query at generation time)
+    }
+
+Invalid descriptions raise ValueError, nothing here prompts or prints.
+'''
+from collections.abc import Mapping
+from copy import deepcopy
+from typing import Any
+
+from makefile_generator.config import (
+    C_STANDARDS,
+    COMPILER_CACHES,
+    COMPILER_FAMILIES,
+    COMPILERS,
+    CPP_STANDARDS,
+    LINKERS,
+    TEMPLATES
+)
+from makefile_generator.core.packages import PKG_CONFIG_MODES, library_flags
+from makefile_generator.core.targets import plan_targets
+
+SYSTEMS = ['windows', 'mac', 'linux']
+LANGS = ['c', 'c++']
+GUI_LIBS = ['sdl2', 'sfml', 'raylib']
+BACKENDS = ['make', 'ninja']
+
+DEFAULT_DIRECTORIES = {
+    'bin' : 'bin',
+    'src' : 'src',
+    'build' : 'build',
+    'include' : 'include',
+}
+
+def get_key_for(target_system: str, /):
+    if target_system == 'windows':
+        return 'win32'
+    else:
+        return 'unix'
+
+
+def is_valid_standard(lang: str, standard: str) -> bool:
+    if lang == 'c':
+        return standard.upper() in C_STANDARDS or standard.lower() == 'c18'
+    return standard.upper() in CPP_STANDARDS
+
+
+def gui_lib_flags(lib: str, target_system: str | None, cross_platform: bool) -> dict[str, str]:
+    return library_flags([lib], target_system, cross_platform)
+
+
+def template_for(project: Mapping[str, Any]) -> str:
+    if project.get('backend') == 'ninja':
+        return TEMPLATES['ninja']
+    if project.get('cross_platform'):
+        return TEMPLATES['cross-platform']
+    return TEMPLATES[str(project.get('target_system')).lower()]
+
+
+def _lang_of(project: Mapping[str, Any]) -> str:
+    lang = project.get('lang')
+    if not lang:
+        # Data-shaped descriptions only carry the extension or the make variable.
+        if project.get('src_ext') in ('.c', '.cpp'):
+            lang = 'c' if project['src_ext'] == '.c' else 'c++'
+        elif isinstance(project.get('compiler'), Mapping) and project['compiler'].get('var') in ('CC', 'CXX'):
+            lang = 'c' if project['compiler']['var'] == 'CC' else 'c++'
+    lang = str(lang or '').lower()
+    if lang not in LANGS:
+        raise ValueError(f"'lang' must be one of {', '.join(LANGS)} (got {lang or 'nothing'})")
+    return lang
+
+
+def _string_list(project: Mapping[str, Any], key: str) -> list[str]:
+    # A single string is a one-item list (`ignore = "vendor/*"` in mkgen.toml).
+    value = project.get(key) or []
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, (list, tuple)):
+        raise ValueError(f"'{key}' must be a string or a list of strings (got {value!r})")
+    return [str(item) for item in value]
+
+
+def build_data(project: Mapping[str, Any]) -> dict[str, Any]:
+    '''Validate a project description and return the template data for it.'''
+    cross_platform = bool(project.get('cross_platform'))
+    target_system = project.get('target_system')
+    if not cross_platform:
+        if not target_system or str(target_system).lower() not in SYSTEMS:
+            raise ValueError(f"'target_system' must be one of {', '.join(SYSTEMS)} unless 'cross_platform' is set")
+        target_system = str(target_system).lower()
+
+    backend = str(project.get('backend') or 'make').lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"'backend' must be one of {', '.join(BACKENDS)} (got {backend})")
+
+    lang = _lang_of(project)
+    compiler = project.get('compiler') or {}
+    if isinstance(compiler, str):
+        compiler = {'name': compiler, 'std': project.get('standard', '')}
+    if not isinstance(compiler, Mapping):
+        raise ValueError(f"'compiler' must be a {{name, std}} table or a compiler name (got {compiler!r})")
+    name = str(compiler.get('name', ''))
+    if name.lower() not in COMPILERS:
+        raise ValueError(f"'compiler.name' must be one of {', '.join(COMPILERS)} (got {name or 'nothing'})")
+    std = str(compiler.get('std', ''))
+    if not is_valid_standard(lang, std):
+        raise ValueError(f"'compiler.std' {std or '(empty)'} is not a valid {lang.upper()} standard")
+
+    family = COMPILER_FAMILIES[name.lower()]
+    if target_system == 'mac' and family == 'gcc':
+        # Xcode's gcc and g++ are clang in disguise.
+        family = 'clang'
+
+    if not isinstance(project.get('directories') or {}, Mapping):
+        raise ValueError(f"'directories' must be a table of paths (got {project['directories']!r})")
+    directories = dict(DEFAULT_DIRECTORIES)
+    directories.update(project.get('directories') or {})
+    for key, value in directories.items():
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"'directories.{key}' must be a path (got {value!r})")
+
+    data: dict[str, Any] = {
+        'compiler' : {
+         'var' : 'CC' if lang == 'c' else 'CXX',
+         'name' : name,
+         'std' : std.lower(),
+         'family' : family
+        },
+        'directories' : directories,
+        'output_file' : str(project.get('output_file') or 'main'),
+        'src_ext' : '.c' if lang == 'c' else '.cpp',
+        'recursive' : bool(project.get('recursive', False))
+    }
+
+    compiler_cache = str(project.get('compiler_cache') or 'none').lower()
+    if compiler_cache not in COMPILER_CACHES:
+        raise ValueError(f"'compiler_cache' must be one of {', '.join(COMPILER_CACHES)} (got {compiler_cache})")
+    data['compiler_cache'] = compiler_cache
+
+    linker = str(project.get('linker') or 'auto').lower()
+    if linker not in LINKERS:
+        raise ValueError(f"'linker' must be one of {', '.join(LINKERS)} (got {linker})")
+    data['linker'] = linker
+
+    targets = project.get('targets')
+    if targets:
+        if not isinstance(targets, (list, tuple)):
+            raise ValueError(f"'targets' must be a list of target tables (got {targets!r})")
+        if project.get('unity_build'):
+            raise ValueError("'unity_build' cannot be combined with 'targets' yet")
+        if project.get('pch') and name.lower() == 'cl':
+            raise ValueError("'pch' with cl cannot be combined with 'targets' yet")
+        data['targets'] = plan_targets(targets)
+        if project.get('pch') and any(target['pic'] for target in data['targets']):
+            # One header is precompiled for every object, and clang refuses a
+            # PCH whose PIC level differs from the file using it.
+            raise ValueError("'pch' cannot be combined with shared library targets yet")
+        executables = [target['name'] for target in data['targets'] if target['kind'] == 'executable']
+        if executables and data['output_file'] not in executables:
+            # `make run` (and pgo) use the first executable unless output_file names another one.
+            data['output_file'] = executables[0]
+
+    data['ignore'] = _string_list(project, 'ignore')
+    data['unity_exclude'] = _string_list(project, 'unity_exclude')
+    # make's wildcard cannot leave files out, ignoring sources means listing them.
+    data['explicit_sources'] = bool(project.get('explicit_sources') or data['ignore'])
+
+    pkg_config = str(project.get('pkg_config') or 'make').lower()
+    if pkg_config not in PKG_CONFIG_MODES:
+        raise ValueError(f"'pkg_config' must be one of {', '.join(PKG_CONFIG_MODES)} (got {pkg_config})")
+    data['pkg_config'] = pkg_config
+
+    libs = []
+    gui_lib = project.get('gui_lib')
+    if gui_lib:
+        gui_lib = str(gui_lib).lower()
+        if gui_lib not in GUI_LIBS:
+            raise ValueError(f"'gui_lib' must be one of {', '.join(GUI_LIBS)} (got {gui_lib})")
+        libs.append(gui_lib)
+    elif project.get('use_gui_lib'):
+        raise ValueError("'use_gui_lib' needs a 'gui_lib' to know which library to link")
+    libs += [package for package in _string_list(project, 'packages') if package not in libs]
+    if libs:
+        # The GUI library and the extra packages share the LIBS/PKG_CFLAGS variables.
+        data['use_gui_lib'] = True
+        data.update(library_flags(libs, target_system, cross_platform, resolve=pkg_config == 'resolve'))
+    return data
+
+
+def merge_projects(base: Mapping[str, Any], override: Mapping[str, Any]) -> dict[str, Any]:
+    '''Deep-merge two descriptions, override wins (used for manifest defaults).'''
+    merged = deepcopy(dict(base))
+    for key, value in override.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
+            merged[key] = merge_projects(merged[key], value)
+        else:
+            merged[key] = deepcopy(value)
+    return merged
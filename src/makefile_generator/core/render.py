@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Literal
+
+from makefile_generator import __version__
+
+from makefile_generator.core.compdb import COMPDB_NAME, compdb_file
+from makefile_generator.core.ninja import NINJA_FILE, NINJA_MANIFEST, generated_for, ninja_manifest, plan_ninja
+from makefile_generator.core.pch import DEFAULT_PCH_HEADERS, pch_files, plan_pch
+from makefile_generator.core.project import build_data, template_for
+from makefile_generator.core.scan import scan_project, select_sources
+from makefile_generator.core.templates import get_template, template_checksum
+from makefile_generator.core.timings import Timings, phase
+from makefile_generator.core.unity import DEFAULT_UNITY_BATCHES, plan_unity, unity_files
+
+
+STAMP_PREFIX = 'mkgen-stamp:'
+
+# What a generated file is compared to the one on disk: identical, missing,
+# regenerated from other inputs, or edited by hand since mkgen wrote it
+# (including files mkgen never wrote).
+FileStatus = Literal['unchanged', 'missing', 'changed', 'edited']
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _split_stamp(content: str) -> tuple[str | None, str]:
+    '''The stamp line of a generated file (None without one) and the rest of it.'''
+    lines = content.splitlines(keepends=True)
+    for index, line in enumerate(lines[:40]):
+        if STAMP_PREFIX in line:
+            return line, ''.join(lines[:index] + lines[index + 1:])
+    return None, content
+
+
+def render_data(data: Mapping[str, Any], template_name: str) -> str:
+    '''
+    Render a template and stamp the result with a hash of its inputs (data,
+    template source, mkgen version) and of its own content, which is how a
+    later run tells a stale file from a hand-edited one.
+    '''
+    inputs = _digest(json.dumps(
+        [__version__, template_checksum(template_name), data],
+        sort_keys=True,
+        default=str
+    ))
+    content = get_template(template_name).render({**data, 'mkgen_stamp': STAMP_PREFIX})
+    stamp, body = _split_stamp(content)
+    if stamp is None:
+        return content
+    return content.replace(stamp, stamp.replace(STAMP_PREFIX, f'{STAMP_PREFIX} inputs={inputs} content={_digest(body)}'), 1)
+
+
+def render_project(project: Mapping[str, Any]) -> str:
+    '''Render the Makefile of a project description (see core.project).'''
+    return render_data(build_data(project), template_for(project))
+
+
+def render_files(project: Mapping[str, Any], root: Path, timings: Timings | None = None) -> dict[str, str]:
+    '''
+    Every file a project needs, relative to `root` (the directory receiving
+    the Makefile): the Makefile (or build.ninja) itself plus whatever generation-time analysis
+    of the sources produced (precompiled header, unity batches, compilation
+    database...). `timings` records the project, scan and render phases.
+    '''
+    with phase(timings, 'project'):
+        data = build_data(project)
+    with phase(timings, 'scan'):
+        data['sources'] = scan_project(root, data)
+    if data['explicit_sources']:
+        for target in data.get('targets') or []:
+            target['sources'] = select_sources(data['sources'], target['dir'], target['exclude'], data['recursive'])
+    files: dict[str, str] = {}
+    pch = project.get('pch')
+    if pch:
+        with phase(timings, 'scan'):
+            plan = plan_pch(root, data, DEFAULT_PCH_HEADERS if pch is True else int(pch))
+        if plan:
+            data['pch'] = plan
+            files.update(pch_files(plan))
+    unity = project.get('unity_build')
+    if unity:
+        with phase(timings, 'scan'):
+            plan = plan_unity(
+                root,
+                data,
+                DEFAULT_UNITY_BATCHES if unity is True else int(unity),
+                data['unity_exclude']
+            )
+        if plan:
+            data['unity'] = plan
+            files.update(unity_files(plan))
+    if project.get('compile_commands', True):
+        with phase(timings, 'scan'):
+            files[COMPDB_NAME] = compdb_file(root, data, generated_for(project))
+    if str(project.get('backend') or 'make').lower() == 'ninja':
+        with phase(timings, 'scan'):
+            data['ninja'] = plan_ninja(root, data, project)
+        files[NINJA_MANIFEST] = ninja_manifest(project)
+    if not data['explicit_sources']:
+        # The Makefile globs them itself: adding a source must not change its stamp.
+        del data['sources']
+    with phase(timings, 'render'):
+        if 'ninja' in data:
+            files[NINJA_FILE] = render_data(data, template_for(project))
+        else:
+            files['Makefile'] = render_data(data, template_for(project))
+    return files
+
+
+def file_status(path: Path, content: str) -> FileStatus:
+    '''How the file at `path` compares to the freshly generated `content`.'''
+    try:
+        existing = path.read_text()
+    except FileNotFoundError:
+        return 'missing'
+    except (OSError, UnicodeDecodeError):
+        return 'edited'
+    if existing == content:
+        return 'unchanged'
+    stamp, body = _split_stamp(existing)
+    if stamp is None or f'content={_digest(body)}' not in stamp:
+        return 'edited'
+    return 'changed'
+
+
+def write_atomic(path: Path, content: str) -> None:
+    '''
+    Replace `path` in one step (temporary file + rename), so a make running
+    concurrently reads either the old file or the new one, never half of it.
+    The file keeps its permissions.
+    '''
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temporary, 'w') as file:
+            file.write(content)
+        try:
+            shutil.copymode(path, temporary)
+        except FileNotFoundError:
+            pass
+        os.replace(temporary, path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    '''Write `content` to `path` unless it already holds exactly that. Returns True if written.'''
+    try:
+        if path.read_text() == content:
+            return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    write_atomic(path, content)
+    return True
@@ -0,0 +1,253 @@
+'''
+Project tree scanner: the sources and headers under a directory, with a
+persistent index.
+
+Directories are listed with os.scandir, a level at a time and on a thread
+pool once a level is wide enough, so trees of 100k+ files are walked in
+parallel. Every listing is kept in an index under `cache_dir()/scan/`,
+keyed by the directory's mtime: adding, removing or renaming an entry is
+what changes a directory's mtime, so a re-scan only stats the directories
+and lists again the ones that changed. Listings younger than a second when
+the index was written are not trusted (coarse mtimes could hide a change
+made in the same tick).
+
+`scan_project` gives render_files the sources of a project once, shared by
+every generation-time feature (compilation database, unity batches,
+precompiled header, ninja) and, with 'explicit_sources' or 'ignore', written
+into the Makefile instead of its $(wildcard):
+
+    'ignore': ['third_party/*', '*_test.c'],   # globs, relative to the source dir
+    'explicit_sources': True
+'''
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import translate
+from pathlib import Path
+from time import time_ns
+from typing import Any
+
+from makefile_generator import __version__
+from makefile_generator.core.paths import cache_dir
+
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx')
+HEADER_EXTENSIONS = ('.h', '.hh', '.hpp', '.hxx', '.inl', '.ipp', '.tpp')
+# Never part of a project's sources, wherever they are.
+IGNORED_DIRECTORIES = ['.git', '.hg', '.svn', '.mkgen', '__pycache__']
+
+_INDEX_VERSION = 1
+# Below this many directories in a level, a thread pool costs more than it saves.
+_PARALLEL_LEVEL = 16
+_RACY_NS = 1_000_000_000
+
+# A directory listing: its mtime, its sources, headers and subdirectories.
+Listing = tuple[int, list[str], list[str], list[str]]
+
+
+@dataclass
+class Scan:
+    '''Files under the scanned directory, relative to it ('/' separated) and sorted.'''
+    sources: list[str] = field(default_factory=list)
+    headers: list[str] = field(default_factory=list)
+    directories: list[str] = field(default_factory=list)
+    listed: int = 0
+    reused: int = 0
+
+
+def _index_path(directory: Path) -> Path:
+    key = hashlib.sha1(str(directory.resolve()).encode()).hexdigest()[:16]
+    return cache_dir() / 'scan' / f'{key}.json'
+
+
+def _load_index(path: Path) -> dict[str, Listing]:
+    try:
+        stored = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if stored.get('version') != [_INDEX_VERSION, __version__]:
+        return {}
+    trusted = stored.get('written', 0) - _RACY_NS
+    return {
+        relative: (mtime, sources, headers, directories)
+        for relative, (mtime, sources, headers, directories) in stored.get('directories', {}).items()
+        if mtime < trusted
+    }
+
+
+def _save_index(path: Path, listings: dict[str, Listing]) -> None:
+    stored = {
+        'version': [_INDEX_VERSION, __version__],
+        'written': time_ns(),
+        'directories': listings
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_text(json.dumps(stored, separators=(',', ':')))
+        os.replace(temporary, path)
+    except OSError:
+        # A read-only cache directory only costs the next scan its shortcut.
+        pass
+
+
+def _list(path: str, previous: Listing | None) -> tuple[Listing | None, bool]:
+    # (listing, reused); None when the directory cannot be read.
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, False
+    if previous is not None and previous[0] == mtime:
+        return previous, True
+    sources, headers, directories = [], [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.name)
+                elif entry.name.endswith(SOURCE_EXTENSIONS):
+                    sources.append(entry.name)
+                elif entry.name.endswith(HEADER_EXTENSIONS):
+                    headers.append(entry.name)
+    except OSError:
+        return None, False
+    return (mtime, sources, headers, directories), False
+
+
+def _keep(prefix: str, names: list[str], ignored: Callable[[str], Any] | None) -> list[str]:
+    # prefix + name for every name, but the ones an ignore pattern matches (by path or by name).
+    if ignored is None:
+        return [prefix + name for name in names]
+    return [prefix + name for name in names if not ignored(prefix + name) and not ignored(name)]
+
+
+def scan_tree(
+    directory: Path,
+    ignore: Iterable[str] = (),
+    depth: int | None = None,
+    use_index: bool = True,
+    jobs: int | None = None
+) -> Scan:
+    '''
+    Sources and headers under `directory`, `depth` levels of subdirectories
+    deep (all of them by default), leaving out whatever matches an `ignore`
+    glob (on the relative path or on the name).
+    '''
+    patterns = list(ignore)
+    # One regex for all the globs: matching them one by one dominates a scan of a large tree.
+    ignored = re.compile('|'.join(translate(pattern) for pattern in patterns)).match if patterns else None
+    index_path = _index_path(directory)
+    previous = _load_index(index_path) if use_index else {}
+    listings: dict[str, Listing] = {}
+    scan = Scan()
+    pool: ThreadPoolExecutor | None = None
+    level, pending = 0, ['.']
+    try:
+        while pending:
+            paths = [str(directory) if relative == '.' else os.path.join(directory, relative) for relative in pending]
+            olds = [previous.get(relative) for relative in pending]
+            if len(pending) >= _PARALLEL_LEVEL:
+                pool = pool or ThreadPoolExecutor(max_workers=jobs)
+                results = list(pool.map(_list, paths, olds))
+            else:
+                results = [_list(path, old) for path, old in zip(paths, olds)]
+
+            next_level = []
+            for relative, (listing, reused) in zip(pending, results):
+                if listing is None:
+                    continue
+                listings[relative] = listing
+                scan.reused += reused
+                scan.listed += not reused
+                prefix = '' if relative == '.' else relative + '/'
+                scan.sources += _keep(prefix, listing[1], ignored)
+                scan.headers += _keep(prefix, listing[2], ignored)
+                if depth is not None and level >= depth:
+                    continue
+                next_level += _keep(prefix, [name for name in listing[3] if name not in IGNORED_DIRECTORIES], ignored)
+            scan.directories += next_level
+            pending = next_level
+            level += 1
+    finally:
+        if pool:
+            pool.shutdown()
+
+    if use_index and listings != previous:
+        _save_index(index_path, listings)
+    scan.sources.sort()
+    scan.headers.sort()
+    scan.directories.sort()
+    return scan
+
+
+def check_directories(root: Path, directories: Mapping[str, str]) -> None:
+    '''Raise ValueError for a layout the generated Makefile would mishandle.'''
+    resolved = {}
+    for key, value in directories.items():
+        path = root / value
+        if path.exists() and not path.is_dir():
+            raise ValueError(f"directories.{key} ({value}) is not a directory")
+        resolved[key] = path.resolve()
+    for key in ('src', 'include'):
+        for output in ('build', 'bin'):
+            if resolved[key] == resolved[output] or resolved[output] in resolved[key].parents:
+                raise ValueError(
+                    f"directories.{key} ({directories[key]}) is inside directories.{output} "
+                    f"({directories[output]}), which 'make clean' deletes"
+                )
+
+
+def _depth(data: Mapping[str, Any]) -> int | None:
+    if data.get('recursive'):
+        return None
+    # Without -r each target still takes the top level of its own directory.
+    return max((len(target['dir'].split('/')) for target in data.get('targets') or [] if target['dir'] != '.'), default=0)
+
+
+def scan_project(root: Path, data: Mapping[str, Any], use_index: bool = True) -> list[str]:
+    '''
+    The sources of a project (template data), relative to its source
+    directory: the files the Makefile's $(wildcard) would match, minus the
+    ignored ones and the build and bin directories.
+    '''
+    directories = data['directories']
+    check_directories(root, directories)
+    src_dir = root / directories['src']
+    if not src_dir.is_dir():
+        if data.get('explicit_sources'):
+            raise ValueError(f"the source directory {directories['src']} does not exist")
+        return []
+    ignore = list(data.get('ignore') or [])
+    for output in ('build', 'bin'):
+        output_dir = (root / directories[output]).resolve()
+        if src_dir.resolve() in output_dir.parents:
+            ignore.append(output_dir.relative_to(src_dir.resolve()).as_posix())
+    scan = scan_tree(src_dir, ignore, _depth(data), use_index)
+    return [source for source in scan.sources if source.endswith(data['src_ext'])]
+
+
+def select_sources(
+    sources: Iterable[str], directory: str = '.', exclude: Iterable[str] = (), recursive: bool = True
+) -> list[str]:
+    '''The sources in `directory` (all of its subtree with `recursive`), except the `exclude` subtrees.'''
+    prefix = '' if directory == '.' else directory + '/'
+    excluded = [nested + '/' for nested in exclude]
+    return [
+        source for source in sources
+        if source.startswith(prefix)
+        and (recursive or '/' not in source[len(prefix):])
+        and not any(source.startswith(nested) for nested in excluded)
+    ]
+
+
+def project_sources(root: Path, data: Mapping[str, Any], directory: str = '.', exclude: Iterable[str] = ()) -> list[Path]:
+    '''Paths of the sources scan_project found (render_files stores them in data['sources']).'''
+    src_dir = root / data['directories']['src']
+    sources = data['sources'] if 'sources' in data else scan_project(root, data)
+    return [
+        src_dir / source
+        for source in select_sources(sources, directory, exclude, data.get('recursive', False))
+    ]
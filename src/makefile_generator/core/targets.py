@@ -0,0 +1,118 @@
+'''
+Multi-target projects: executables, static archives and shared libraries,
+each built from its own subtree of the source directory.
+
+    'targets': [
+        {'name': 'core', 'type': 'static'},                      # src/core/
+        {'name': 'render', 'type': 'shared', 'deps': ['core']},
+        {'name': 'game', 'type': 'executable', 'src': 'game', 'deps': ['render']},
+        {'name': 'tests', 'type': 'executable', 'deps': ['core']}
+    ]
+
+`src` is relative to the source directory and defaults to the target name
+('.' is the whole directory). A target never compiles the subtree of
+another target nested in its own, so every source belongs to exactly one
+target and is compiled once, whoever links it. The generated Makefile has
+one link rule per target, so a change only relinks the targets that see it.
+'''
+import posixpath
+import re
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+TARGET_TYPES = ['executable', 'static', 'shared']
+
+_NAME_RE = re.compile(r'^[A-Za-z0-9_][A-Za-z0-9_.-]*$')
+
+
+def parse_target(spec: str) -> dict[str, Any]:
+    '''`name:type[:dep,dep...]`, the command-line form of a target.'''
+    name, _, rest = spec.partition(':')
+    kind, _, deps = rest.partition(':')
+    target: dict[str, Any] = {'name': name, 'type': kind or 'executable'}
+    if deps:
+        target['deps'] = [dep for dep in deps.split(',') if dep]
+    return target
+
+
+def _normalized_dir(target: Mapping[str, Any]) -> str:
+    directory = posixpath.normpath(str(target.get('src') or target['name']).replace('\\', '/'))
+    if directory.startswith('../') or directory == '..' or posixpath.isabs(directory):
+        raise ValueError(f"target '{target['name']}': 'src' must stay inside the source directory (got {directory})")
+    return directory
+
+
+def _inside(directory: str, parent: str) -> bool:
+    return parent == '.' or directory.startswith(parent + '/')
+
+
+def _link_order(name: str, deps: Mapping[str, list[str]]) -> list[str]:
+    # Every library a target needs, transitively, dependents before their
+    # dependencies (the order static archives must be given to the linker).
+    order: list[str] = []
+    visiting: list[str] = []
+
+    def visit(target: str) -> None:
+        if target in visiting:
+            cycle = ' -> '.join(visiting[visiting.index(target):] + [target])
+            raise ValueError(f'targets depend on each other: {cycle}')
+        if target in order:
+            return
+        visiting.append(target)
+        for dep in deps[target]:
+            visit(dep)
+        visiting.pop()
+        order.insert(0, target)
+
+    visit(name)
+    return order[1:]
+
+
+def plan_targets(targets: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    '''
+    Validate target descriptions and return them as template data: name,
+    kind, dir, exclude (nested target directories), libs (link order) and
+    pic (objects that end up in a shared library).
+    '''
+    planned: dict[str, dict[str, Any]] = {}
+    for target in targets:
+        if not isinstance(target, Mapping) or not target.get('name'):
+            raise ValueError("every target needs a 'name'")
+        name = str(target['name'])
+        if not _NAME_RE.match(name):
+            raise ValueError(f"target name '{name}' may only use letters, digits, '_', '.' and '-'")
+        if name in planned:
+            raise ValueError(f"target '{name}' is defined twice")
+        kind = str(target.get('type') or 'executable').lower()
+        if kind not in TARGET_TYPES:
+            raise ValueError(f"target '{name}': 'type' must be one of {', '.join(TARGET_TYPES)} (got {kind})")
+        deps = target.get('deps') or []
+        if isinstance(deps, str):
+            deps = [deps]
+        planned[name] = {'name': name, 'kind': kind, 'dir': _normalized_dir(target), 'deps': [str(dep) for dep in deps]}
+    if not planned:
+        raise ValueError("'targets' must list at least one target")
+
+    for target in planned.values():
+        for dep in target['deps']:
+            if dep not in planned:
+                raise ValueError(f"target '{target['name']}' depends on unknown target '{dep}'")
+            if planned[dep]['kind'] == 'executable':
+                raise ValueError(f"target '{target['name']}' cannot depend on executable '{dep}'")
+        others = [other for other in planned.values() if other is not target]
+        for other in others:
+            if other['dir'] == target['dir']:
+                raise ValueError(f"targets '{other['name']}' and '{target['name']}' share the directory {target['dir']}")
+        target['exclude'] = sorted(other['dir'] for other in others if _inside(other['dir'], target['dir']))
+
+    deps = {name: target['deps'] for name, target in planned.items()}
+    for target in planned.values():
+        target['libs'] = _link_order(target['name'], deps)
+    for target in planned.values():
+        if target['kind'] == 'shared':
+            for name in [target['name'], *target['libs']]:
+                planned[name]['pic'] = planned[name]['kind'] != 'executable'
+    for target in planned.values():
+        target.setdefault('pic', False)
+        del target['deps']
+    return list(planned.values())
@@ -0,0 +1,127 @@
+'''
+Process-wide template environment backed by an on-disk bytecode cache.
+
+The jinja2 Environment is created once, on first use, and keeps compiled
+templates in memory. Compiled bytecode is also persisted under
+`cache_dir()/templates/<version>/`, keyed by the template source hash and the
+mkgen version, so a fresh process never re-parses a template either.
+Set MKGEN_NO_CACHE=1 to keep everything in memory.
+'''
+import hashlib
+import os
+import shutil
+from functools import cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, Template
+from jinja2.bccache import Bucket, FileSystemBytecodeCache
+
+from makefile_generator import __version__
+from makefile_generator.config import TEMPLATES_DIR
+from makefile_generator.core.paths import cache_dir, env_flag
+
+_stats = {
+    'memory_hits': 0,
+    'disk_hits': 0,
+    'misses': 0
+}
+
+
+class _TemplateBytecodeCache(FileSystemBytecodeCache):
+
+    def __init__(self, directory: Path | None) -> None:
+        # Without a directory nothing is ever read or written, only counted.
+        self.persistent = directory is not None
+        super().__init__(str(directory) if self.persistent else os.curdir)
+
+    def get_bucket(self, environment: Environment, name: str, filename: str | None, source: str) -> Bucket:
+        checksum = self.get_source_checksum(source)
+        key = hashlib.sha1(f'{__version__}|{checksum}|{name}'.encode()).hexdigest()
+        bucket = Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        if self.persistent:
+            super().load_bytecode(bucket)
+        if bucket.code is None:
+            _stats['misses'] += 1
+        else:
+            _stats['disk_hits'] += 1
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        if not self.persistent:
+            return
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            # A read-only or full cache directory only costs us the next compile.
+            pass
+
+
+def template_cache_dir() -> Path:
+    return cache_dir() / 'templates'
+
+
+def _bytecode_cache_dir() -> Path | None:
+    if env_flag('MKGEN_NO_CACHE'):
+        return None
+    directory = template_cache_dir() / __version__
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return directory
+
+
+@cache
+def get_environment() -> Environment:
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR), #type: ignore
+        bytecode_cache=_TemplateBytecodeCache(_bytecode_cache_dir()),
+        lstrip_blocks=True,
+        trim_blocks=True,
+        auto_reload=False
+    )
+
+
+def get_template(name: str) -> Template:
+    loads = _stats['disk_hits'] + _stats['misses']
+    template = get_environment().get_template(name)
+    if _stats['disk_hits'] + _stats['misses'] == loads:
+        _stats['memory_hits'] += 1
+    return template
+
+
+@cache
+def template_checksum(name: str) -> str:
+    '''Hash of a template's source, part of the inputs stamped into generated files.'''
+    environment = get_environment()
+    source, _, _ = environment.loader.get_source(environment, name) #type: ignore
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+def cache_stats() -> dict[str, int]:
+    '''Hit/miss counters of the current process.'''
+    return dict(_stats)
+
+
+def disk_cache_info() -> dict[str, str | int]:
+    root = template_cache_dir()
+    files = [f for f in root.rglob('*.cache') if f.is_file()] if root.is_dir() else []
+    return {
+        'directory': str(root),
+        'entries': len(files),
+        'size': sum(f.stat().st_size for f in files)
+    }
+
+
+def clear_template_cache() -> int:
+    '''Drop every cached template (all mkgen versions). Returns the number of entries removed.'''
+    removed = disk_cache_info()['entries']
+    shutil.rmtree(template_cache_dir(), ignore_errors=True)
+    get_environment.cache_clear()
+    template_checksum.cache_clear()
+    for key in _stats:
+        _stats[key] = 0
+    return removed #type: ignore
@@ -0,0 +1,43 @@
+'''
+Wall time of the phases of one mkgen run (`mkgen generate --timings`).
+
+    timings = Timings()
+    with timings.phase('render'):
+        ...
+    timings.report()    # {'phases_ms': {'render': 1.234}, 'total_ms': ...}
+
+A phase entered several times adds up. The total runs from the creation of
+the Timings (or the `started` perf_counter value it was given) to the report.
+'''
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Any, ContextManager
+
+
+class Timings:
+    def __init__(self, started: float | None = None) -> None:
+        self.started = perf_counter() if started is None else started
+        self.phases: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            'phases_ms': {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            'total_ms': round((perf_counter() - self.started) * 1000, 3)
+        }
+
+
+def phase(timings: Timings | None, name: str) -> ContextManager[None]:
+    '''`timings.phase(name)`, or nothing when no timings are being recorded.'''
+    return timings.phase(name) if timings is not None else nullcontext()
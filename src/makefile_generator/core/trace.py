@@ -0,0 +1,132 @@
+'''
+Build profiles recorded by `make MODE=trace` (or `make build-profile`).
+
+The traced compile recipe writes `<object>.time` next to every object: the
+source on the first line, then the start and end timestamps of the compile
+in microseconds. With clang, `-ftime-trace` also leaves `<object>.json`,
+whose "Source" events give the time spent parsing each header.
+
+`build_profile` merges them into the slowest translation units, the slowest
+headers and a Chrome trace (chrome://tracing, Perfetto) of the whole build,
+one lane per concurrent compile.
+'''
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+CHROME_TRACE_NAME = 'build-trace.json'
+# Clang events shorter than this are left out of the Chrome trace, they make
+# it heavy without telling much.
+_MIN_EVENT_US = 500
+
+
+def _read_unit(path: Path) -> dict[str, Any] | None:
+    try:
+        lines = path.read_text(errors='replace').split()
+        source, start, end = lines[0], int(lines[1]), int(lines[2])
+    except (OSError, IndexError, ValueError):
+        # Interrupted or failed compile: no end timestamp.
+        return None
+    return {
+        'source': source,
+        'object': path.with_suffix('.o').as_posix(),
+        'start': start,
+        'duration': max(end - start, 0)
+    }
+
+
+def _read_time_trace(path: Path) -> list[dict[str, Any]]:
+    try:
+        events = json.loads(path.read_text()).get('traceEvents', [])
+    except (OSError, ValueError, AttributeError):
+        return []
+    return [event for event in events if event.get('ph') == 'X' and 'dur' in event]
+
+
+def _assign_lanes(units: list[dict[str, Any]]) -> None:
+    # Greedy interval packing: a compile reuses the first lane that is free
+    # when it starts, which recovers the job slots of the parallel build.
+    lane_ends: list[int] = []
+    for unit in sorted(units, key=lambda unit: unit['start']):
+        for lane, end in enumerate(lane_ends):
+            if end <= unit['start']:
+                break
+        else:
+            lane = len(lane_ends)
+            lane_ends.append(0)
+        lane_ends[lane] = unit['start'] + unit['duration']
+        unit['lane'] = lane
+
+
+def build_profile(build_dir: Path, top: int = 20) -> tuple[dict[str, Any], dict[str, Any]]:
+    '''
+    Summarize the traced build in `build_dir`. Returns the report and the
+    Chrome trace; raises FileNotFoundError when no compile was traced.
+    '''
+    units = []
+    for dirpath, _, filenames in os.walk(build_dir):
+        for name in filenames:
+            if name.endswith('.time'):
+                unit = _read_unit(Path(dirpath) / name)
+                if unit:
+                    units.append(unit)
+    if not units:
+        raise FileNotFoundError(f'no traced compile in {build_dir} (build with `make build-profile` first)')
+
+    _assign_lanes(units)
+    origin = min(unit['start'] for unit in units)
+    wall_time = max(unit['start'] + unit['duration'] for unit in units) - origin
+    events = []
+    headers: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+    time_traces = 0
+    for unit in units:
+        offset = unit['start'] - origin
+        events.append({
+            'name': unit['source'],
+            'cat': 'compile',
+            'ph': 'X',
+            'pid': 1,
+            'tid': unit['lane'],
+            'ts': offset,
+            'dur': unit['duration']
+        })
+        clang_events = _read_time_trace(Path(unit['object']).with_suffix('.json'))
+        time_traces += bool(clang_events)
+        for event in clang_events:
+            detail = event.get('args', {}).get('detail', '')
+            if event['name'] == 'Source' and detail:
+                headers[detail][0] += event['dur']
+                headers[detail][1] += 1
+            if event['dur'] >= _MIN_EVENT_US and not event['name'].startswith('Total '):
+                events.append({
+                    'name': f"{event['name']} {detail}".strip(),
+                    'cat': 'clang',
+                    'ph': 'X',
+                    'pid': 1,
+                    'tid': unit['lane'],
+                    'ts': offset + event.get('ts', 0),
+                    'dur': event['dur']
+                })
+
+    compile_time = sum(unit['duration'] for unit in units)
+    slowest_units = sorted(units, key=lambda unit: -unit['duration'])[:top]
+    slowest_headers = sorted(headers.items(), key=lambda item: -item[1][0])[:top]
+    report = {
+        'build_dir': str(build_dir),
+        'units': len(units),
+        'time_traces': time_traces,
+        'wall_time_ms': wall_time / 1000,
+        'compile_time_ms': compile_time / 1000,
+        'parallelism': round(compile_time / wall_time, 2) if wall_time else 1.0,
+        'slowest_units': [
+            {'source': unit['source'], 'object': unit['object'], 'duration_ms': unit['duration'] / 1000}
+            for unit in slowest_units
+        ],
+        'slowest_headers': [
+            {'header': header, 'total_ms': total / 1000, 'included': count}
+            for header, (total, count) in slowest_headers
+        ]
+    }
+    return report, {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -0,0 +1,97 @@
+'''
+Unity (jumbo) build planning.
+
+The project's sources are grouped into N unity translation units that just
+`#include` them, written to `.mkgen/unity/`. Groups are balanced by source
+size, and stay stable as the tree changes: each file goes to the batch it
+ranks highest by rendezvous hashing, unless that batch is already over its
+share of the total size. Adding or removing one file therefore moves at
+most a few neighbours (spilling to their next preferred batch), instead of
+reshuffling every batch.
+'''
+import hashlib
+import os
+from collections.abc import Iterable, Mapping
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+from makefile_generator.core.scan import project_sources
+
+UNITY_DIR = '.mkgen/unity'
+DEFAULT_UNITY_BATCHES = 8
+# How far above an even share of the total size a batch may grow before
+# files spill over to their next preferred batch.
+_SLACK = 1.25
+
+
+def _score(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+
+def balance(files: Mapping[str, int], batches: int) -> list[list[str]]:
+    '''Split `files` (path -> size) into at most `batches` size-balanced, hash-stable groups.'''
+    batches = max(1, min(batches, len(files)))
+    capacity = sum(files.values()) / batches * _SLACK
+    loads = [0] * batches
+    groups: list[list[str]] = [[] for _ in range(batches)]
+    for path in sorted(files, key=_score):
+        size = files[path]
+        ranking = sorted(range(batches), key=lambda batch: _score(f'{batch}:{path}'), reverse=True)
+        target = next(
+            (batch for batch in ranking if loads[batch] == 0 or loads[batch] + size <= capacity),
+            min(range(batches), key=loads.__getitem__)
+        )
+        loads[target] += size
+        groups[target].append(path)
+    return [sorted(group) for group in groups if group]
+
+
+def _excluded(path: str, patterns: Iterable[str]) -> bool:
+    return any(fnmatch(path, pattern) or fnmatch(os.path.basename(path), pattern) for pattern in patterns)
+
+
+def plan_unity(
+    root: Path,
+    data: Mapping[str, Any],
+    batches: int = DEFAULT_UNITY_BATCHES,
+    exclude: Iterable[str] = ()
+) -> dict[str, Any] | None:
+    '''
+    Group the sources of a project. `exclude` holds glob patterns (matched
+    against the path relative to the source directory, or the file name) of
+    files that do not combine cleanly; those keep their own object.
+    '''
+    src_dir = root / data['directories']['src']
+    exclude = list(exclude)
+    sizes, excluded = {}, []
+    for source in project_sources(root, data):
+        relative = source.relative_to(src_dir).as_posix()
+        if _excluded(relative, exclude):
+            excluded.append(relative)
+        else:
+            sizes[relative] = source.stat().st_size
+    if not sizes:
+        return None
+
+    groups = balance(sizes, batches)
+    names = [f'unity_{index}{data["src_ext"]}' for index in range(len(groups))]
+    return {
+        'dir': UNITY_DIR,
+        'batches': names,
+        'groups': dict(zip(names, groups)),
+        'excluded': excluded,
+        'src_dir': data['directories']['src']
+    }
+
+
+def unity_files(plan: Mapping[str, Any]) -> dict[str, str]:
+    '''The unity translation units of a plan returned by plan_unity.'''
+    files = {}
+    total = len(plan['batches'])
+    src_from_unity = Path(os.path.relpath(plan['src_dir'], plan['dir'])).as_posix()
+    for index, name in enumerate(plan['batches']):
+        lines = [f'/* Generated by mkgen: unity batch {index + 1} of {total}. Regenerate instead of editing. */']
+        lines += [f'#include "{src_from_unity}/{source}"' for source in plan['groups'][name]]
+        files[f'{plan["dir"]}/{name}'] = '\n'.join(lines) + '\n'
+    return files
@@ -0,0 +1,235 @@
+'''
+Wait for changes to a project's layout, for `mkgen watch`.
+
+On Linux the directories are watched with inotify (through ctypes, no extra
+dependency), so an idle watch blocks in select() and costs nothing. Elsewhere,
+or when inotify is unavailable or out of watches, the directories' mtimes are
+polled: a directory's mtime moves whenever an entry is added, removed or
+renamed in it, so one stat per directory is enough to notice new sources and
+subdirectories, and a stat of each watched file covers the config files.
+
+Bursts of events (a `git checkout`, an editor's save dance) are debounced:
+`wait()` only returns once the tree has been quiet for `debounce` seconds.
+'''
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+# Directories that never hold anything the Makefile is generated from, and
+# that builds write to (watching them would make every build retrigger).
+IGNORED_DIRECTORIES = {'.git', '.hg', '.svn', '.mkgen', 'build', 'bin', '__pycache__'}
+DEFAULT_DEBOUNCE = 0.3
+DEFAULT_POLL_INTERVAL = 1.0
+
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_ISDIR = 0x40000000
+_IN_Q_OVERFLOW = 0x4000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+_DIRECTORY_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct('iIII')
+
+
+def _walk_directories(directory: Path) -> list[Path]:
+    found = [directory]
+    pending = [str(directory)]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name not in IGNORED_DIRECTORIES and entry.is_dir(follow_symlinks=False):
+                found.append(Path(entry.path))
+                pending.append(entry.path)
+    return found
+
+
+class _InotifyWatcher:
+
+    def __init__(self, directories: Iterable[Path], files: Iterable[Path]) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        # Watched trees report every event, the directories holding watched
+        # files only the events about those files. Files are watched through
+        # their directory since editors usually replace them (write a
+        # temporary file, rename it over) rather than write in place.
+        self._trees: dict[int, Path] = {}
+        self._file_names: dict[int, set[str]] = {}
+        # Directories that do not exist yet, by the watch of their nearest
+        # existing parent and the name of the first missing level.
+        self._pending: dict[int, dict[str, Path]] = {}
+        try:
+            for directory in directories:
+                self._watch_directory(directory)
+            for file in files:
+                self._file_names.setdefault(self._add(file.parent), set()).add(file.name)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, path: Path) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _DIRECTORY_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'cannot watch {path}')
+        return wd
+
+    def _watch_directory(self, directory: Path) -> None:
+        # The directory's tree once it exists, else the nearest existing parent
+        # for its next missing level (rechecked, it may appear meanwhile).
+        while not directory.is_dir():
+            missing = directory
+            while not missing.parent.is_dir():
+                if missing.parent == missing:
+                    return
+                missing = missing.parent
+            wd = self._add(missing.parent)
+            if not missing.is_dir():
+                self._pending.setdefault(wd, {})[missing.name] = directory
+                return
+        for path in _walk_directories(directory):
+            self._trees[self._add(path)] = path
+
+    def _relevant(self, wd: int, mask: int, name: str) -> bool:
+        pending = self._pending.get(wd, {})
+        if name in pending and mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+            try:
+                self._watch_directory(pending.pop(name))
+            except OSError:
+                pass
+            return True
+        directory = self._trees.get(wd)
+        if directory is None:
+            return name in self._file_names.get(wd, ())
+        if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO) and name not in IGNORED_DIRECTORIES:
+            for path in _walk_directories(directory / name):
+                try:
+                    self._trees[self._add(path)] = path
+                except OSError:
+                    # Gone already, or out of watches: the next change is still seen
+                    # through the parent.
+                    pass
+        return True
+
+    def _drain(self) -> bool:
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + _EVENT.size: offset + _EVENT.size + length].rstrip(b'\0'))
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW or self._relevant(wd, mask, name):
+                    changed = True
+
+    def wait(self, debounce: float) -> None:
+        while True:
+            select.select([self.fd], [], [])
+            if not self._drain():
+                continue
+            # Keep swallowing events until the tree has been quiet for a while.
+            while select.select([self.fd], [], [], debounce)[0]:
+                self._drain()
+            return
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingWatcher:
+
+    def __init__(self, directories: Iterable[Path], files: Iterable[Path], interval: float) -> None:
+        self._directories = list(directories)
+        self._files = list(files)
+        self.interval = interval
+        self._snapshot = self._take()
+
+    def _take(self) -> dict[Path, int]:
+        snapshot = {}
+        paths = [path for directory in self._directories for path in _walk_directories(directory)]
+        for path in paths + self._files:
+            try:
+                snapshot[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                snapshot[path] = 0
+        return snapshot
+
+    def wait(self, debounce: float) -> None:
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._take()
+            if snapshot != self._snapshot:
+                break
+        while True:
+            time.sleep(max(debounce, 0.05))
+            latest = self._take()
+            if latest == snapshot:
+                break
+            snapshot = latest
+        self._snapshot = snapshot
+
+    def close(self) -> None:
+        pass
+
+
+class Watcher:
+    '''
+    Blocks in `wait()` until something changed under `directories`
+    (recursively, including a missing one being created) or one of `files`
+    was written, replaced or removed.
+    '''
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        files: Iterable[Path] = (),
+        *,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        force_polling: bool = False
+    ) -> None:
+        # Missing directories are watched too: creating one is a change.
+        directories = [Path(os.path.abspath(path)) for path in directories]
+        files = [Path(os.path.abspath(path)) for path in files]
+        self.backend = 'polling'
+        self._watcher: _InotifyWatcher | _PollingWatcher
+        if sys.platform.startswith('linux') and not force_polling:
+            try:
+                self._watcher = _InotifyWatcher(directories, files)
+                self.backend = 'inotify'
+                return
+            except (OSError, AttributeError):
+                pass
+        self._watcher = _PollingWatcher(directories, files, poll_interval)
+
+    def wait(self, debounce: float = DEFAULT_DEBOUNCE) -> None:
+        self._watcher.wait(debounce)
+
+    def close(self) -> None:
+        self._watcher.close()
+
+    def __enter__(self) -> 'Watcher':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
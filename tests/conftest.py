@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch) -> Path:
+    '''Keep the template and scan caches of every test out of the user's cache.'''
+    path = tmp_path_factory.mktemp('cache')
+    monkeypatch.setenv('MKGEN_CACHE_DIR', str(path))
+    return path
+
+
+@pytest.fixture
+def make_tree(tmp_path: Path):
+    '''Write {relative path: content} under a fresh project root and return it.'''
+    def make(files: dict[str, str]) -> Path:
+        for name, content in files.items():
+            path = tmp_path / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        (tmp_path / 'src').mkdir(exist_ok=True)
+        (tmp_path / 'include').mkdir(exist_ok=True)
+        return tmp_path
+    return make
+
+
+@pytest.fixture
+def project() -> dict:
+    '''A minimal valid project description.'''
+    return {
+        'target_system': 'linux',
+        'lang': 'c',
+        'compiler': {'name': 'gcc', 'std': 'c11'}
+    }
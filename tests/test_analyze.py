@@ -0,0 +1,89 @@
+import pytest
+
+from makefile_generator.core.analyze import _components, analyze
+
+A_H = '#pragma once\n#include "b.h"\n'
+B_H = '#pragma once\nint b(void);\n'
+X_C = '#include "a.h"\nint x;\n'
+Y_C = '#include <stdio.h>\n#include "b.h"\nint y;\n'
+Z_C = 'int z;\n'
+
+
+@pytest.fixture
+def tree(make_tree):
+    return make_tree({
+        'include/a.h': A_H,
+        'include/b.h': B_H,
+        'src/x.c': X_C,
+        'src/y.c': Y_C,
+        'src/z.c': Z_C
+    })
+
+
+def test_components_put_dependencies_first_and_group_cycles():
+    graph = {'main.c': ['a.h'], 'a.h': ['b.h'], 'b.h': ['c.h'], 'c.h': ['a.h'], 'self.h': ['self.h']}
+    components = _components(graph)
+    assert sorted(components) == [['a.h', 'b.h', 'c.h'], ['main.c'], ['self.h']]
+    assert components.index(['a.h', 'b.h', 'c.h']) < components.index(['main.c'])
+
+
+def test_fan_in_and_rebuild_cost(tree):
+    report = analyze(tree)
+    assert (report['sources'], report['headers'], report['edges']) == (3, 2, 3)
+    units = {unit['path']: unit for unit in report['translation_units']}
+    sizes = {
+        'src/x.c': len(X_C) + len(A_H) + len(B_H),
+        'src/y.c': len(Y_C) + len(B_H),
+        'src/z.c': len(Z_C)
+    }
+    assert {path: unit['size'] for path, unit in units.items()} == sizes
+    assert (units['src/x.c']['headers'], units['src/x.c']['depth']) == (2, 2)
+    headers = {row['path']: row for row in report['header_costs']}
+    # <stdio.h> is not in the tree, only the project's own headers are ranked.
+    assert set(headers) == {'include/a.h', 'include/b.h'}
+    assert headers['include/b.h'] == {
+        'path': 'include/b.h',
+        'fan_in': 2,
+        'direct_fan_in': 1,
+        'rebuild_cost': sizes['src/x.c'] + sizes['src/y.c'],
+        'depth': 0,
+        'size': len(B_H)
+    }
+    assert (headers['include/a.h']['fan_in'], headers['include/a.h']['rebuild_cost']) == (1, sizes['src/x.c'])
+    assert [row['path'] for row in report['header_costs']] == ['include/b.h', 'include/a.h']
+    assert report['cycles'] == []
+
+
+def test_include_cycles_are_reported(make_tree):
+    root = make_tree({
+        'include/a.h': '#include "b.h"\n',
+        'include/b.h': '#include "a.h"\n',
+        'src/main.c': '#include "a.h"\n'
+    })
+    report = analyze(root)
+    assert report['cycles'] == [['include/a.h', 'include/b.h']]
+    assert {row['path']: row['fan_in'] for row in report['header_costs']} == {'include/a.h': 1, 'include/b.h': 1}
+
+
+def test_cached_report_is_reused(tree):
+    first = analyze(tree)
+    second = analyze(tree)
+    assert first['cache'] == {'hits': 0, 'misses': 5}
+    assert second['cache'] == {'hits': 5, 'misses': 0}
+    assert {**first, 'cache': None} == {**second, 'cache': None}
+    (tree / 'src/z.c').write_text('#include "b.h"\n')
+    third = analyze(tree)
+    assert third['cache'] == {'hits': 4, 'misses': 1}
+    assert {row['path']: row['fan_in'] for row in third['header_costs']}['include/b.h'] == 3
+
+
+@pytest.mark.parametrize(('value', 'cached'), [('1', False), ('yes', False), ('0', True), ('off', True), ('', True)])
+def test_mkgen_no_cache(tree, monkeypatch, value, cached):
+    analyze(tree)
+    monkeypatch.setenv('MKGEN_NO_CACHE', value)
+    assert analyze(tree)['cache']['hits'] == (5 if cached else 0)
+
+
+def test_missing_directories(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        analyze(tmp_path)
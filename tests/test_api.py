@@ -0,0 +1,85 @@
+import subprocess
+
+import pytest
+
+from makefile_generator import ConfigError, ProjectConfig, render, render_all, write
+
+
+def _config(**values) -> ProjectConfig:
+    return ProjectConfig(lang='c', compiler='gcc', standard='c11', target_system='linux', **values)
+
+
+def test_defaults_fill_directories():
+    config = _config(directories={'src': 'source'})
+    assert config.directories == {'bin': 'bin', 'src': 'source', 'build': 'build', 'include': 'include'}
+
+
+@pytest.mark.parametrize('values', [
+    {'directories': 5},
+    {'packages': 'glfw3'},
+    {'ignore': 5},
+    {'targets': {'name': 'core'}},
+    {'pkg_config': 'always'},
+    {'backend': 'cmake'},
+    {'directories': {'src': ''}}
+])
+def test_invalid_fields_raise_config_error(values):
+    with pytest.raises(ConfigError):
+        _config(**values)
+
+
+def test_config_error_is_a_value_error():
+    with pytest.raises(ValueError):
+        ProjectConfig(lang='c', compiler='gcc', standard='c++17', target_system='linux')
+
+
+def test_validation_does_not_run_pkg_config(monkeypatch):
+    def forbidden(*args, **kwargs):
+        raise AssertionError('pkg-config ran while validating')
+    monkeypatch.setattr(subprocess, 'run', forbidden)
+    config = _config(packages=['glfw3'], pkg_config='resolve')
+    assert config.pkg_config == 'resolve'
+
+
+def test_resolve_needs_a_target_system():
+    with pytest.raises(ConfigError, match='target_system'):
+        ProjectConfig(lang='c', compiler='gcc', standard='c11', cross_platform=True, packages=['glfw3'], pkg_config='resolve')
+
+
+def test_from_project_round_trip():
+    project = {
+        'lang': 'C',
+        'compiler': {'name': 'gcc', 'std': 'c11'},
+        'target_system': 'linux',
+        'ignore': 'vendor/*',
+        'gui_lib': None
+    }
+    config = ProjectConfig.from_project(project)
+    assert (config.lang, config.compiler, config.standard, config.ignore) == ('c', 'gcc', 'c11', ['vendor/*'])
+    assert ProjectConfig.from_project(config.to_project()) == config
+
+
+def test_from_project_rejects_unknown_keys():
+    with pytest.raises(ConfigError, match='colour'):
+        ProjectConfig.from_project({'lang': 'c', 'compiler': 'gcc', 'standard': 'c11', 'target_system': 'linux', 'colour': 'red'})
+
+
+def test_render_and_write(make_tree):
+    root = make_tree({'src/main.c': 'int main(void) { return 0; }\n'})
+    config = _config()
+    files = render_all(config, root)
+    assert set(files) == {'Makefile', 'compile_commands.json'}
+    assert render(config, root) == files['Makefile']
+    assert sorted(write(config, root)) == [root / 'Makefile', root / 'compile_commands.json']
+    assert write(config, root) == []
+
+
+def test_render_accepts_a_mapping(make_tree):
+    root = make_tree({'src/main.c': ''})
+    project = {'lang': 'c', 'compiler': 'gcc', 'standard': 'c11', 'target_system': 'linux', 'backend': 'ninja'}
+    assert render(project, root).startswith('#') and 'rule cc' in render(project, root)
+
+
+def test_write_needs_an_existing_directory(tmp_path):
+    with pytest.raises(NotADirectoryError):
+        write(_config(), tmp_path / 'missing')
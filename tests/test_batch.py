@@ -0,0 +1,59 @@
+import pytest
+
+from makefile_generator.core.batch import generate_many, generate_project, summarize
+from makefile_generator.core.project import build_data
+
+
+def test_generate_project_writes_then_leaves_unchanged(make_tree, project):
+    root = make_tree({'src/main.c': 'int main(void) { return 0; }\n'})
+    first = generate_project({**project, 'output': str(root)})
+    assert first.status == 'written', first.message
+    makefile = root / 'Makefile'
+    mtime = makefile.stat().st_mtime_ns
+    second = generate_project({**project, 'output': str(root)})
+    assert second.status == 'unchanged'
+    assert makefile.stat().st_mtime_ns == mtime
+
+
+def test_missing_output_directory_fails(tmp_path, project):
+    result = generate_project({**project, 'output': str(tmp_path / 'missing')})
+    assert result.status == 'failed'
+    assert 'does not exist' in result.message
+
+
+@pytest.mark.parametrize('override', [
+    {'directories': 5},
+    {'lang': None, 'compiler': 'gcc', 'standard': 'c11'},
+    {'compiler': 5},
+    {'targets': 5},
+    {'ignore': 5},
+    {'packages': {'glfw3': True}},
+    {'pch': [1]}
+])
+def test_malformed_projects_fail_alone(make_tree, project, override):
+    root = make_tree({'src/main.c': ''})
+    result = generate_project({**project, **override, 'output': str(root)})
+    assert result.status == 'failed'
+    assert result.message
+
+
+def test_string_compiler_gives_the_language_from_the_standard_key(project):
+    data = build_data({**project, 'compiler': 'g++', 'standard': 'c++17', 'lang': 'c++'})
+    assert data['compiler'] == {'var': 'CXX', 'name': 'g++', 'std': 'c++17', 'family': 'gcc'}
+
+
+def test_generate_many_keeps_manifest_order(make_tree, project, tmp_path):
+    root = make_tree({'a/src/main.c': '', 'b/src/main.c': ''})
+    (root / 'a/include').mkdir()
+    (root / 'b/include').mkdir()
+    projects = [
+        {**project, 'output': str(root / 'a')},
+        {**project, 'directories': 5, 'output': str(root / 'bad')},
+        {**project, 'output': str(root / 'b')}
+    ]
+    seen = []
+    results = generate_many(projects, jobs=1, on_result=seen.append)
+    assert [result.output for result in results] == [item['output'] for item in projects]
+    assert seen == results
+    summary = summarize(results)
+    assert (summary['written'], summary['unchanged'], summary['failed']) == (2, 0, 1)
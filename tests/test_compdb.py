@@ -0,0 +1,31 @@
+import json
+
+from makefile_generator.core.compdb import compdb_file
+from makefile_generator.core.project import build_data
+from makefile_generator.core.scan import scan_project
+
+
+def _commands(root, project, system='linux'):
+    data = build_data(project)
+    data['sources'] = scan_project(root, data)
+    return {entry['file']: entry['command'] for entry in json.loads(compdb_file(root, data, system))}
+
+
+def test_objects_go_to_the_default_mode_directory(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    assert _commands(root, project) == {
+        'src/main.c': 'gcc -std=c11 -Wall -Werror -Iinclude -O2 -DNDEBUG -c -o build/release/main.o src/main.c'
+    }
+
+
+def test_shared_targets_are_compiled_with_pic(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/core/a.c': ''})
+    project = {**project, 'targets': [
+        {'name': 'core', 'type': 'shared'},
+        {'name': 'app', 'src': '.', 'deps': ['core']}
+    ]}
+    commands = _commands(root, project)
+    assert list(commands) == ['src/core/a.c', 'src/main.c']
+    assert ' -fPIC -c -o build/release/core/a.o ' in commands['src/core/a.c']
+    assert '-fPIC' not in commands['src/main.c']
+    assert '-fPIC' not in _commands(root, {**project, 'target_system': 'windows'}, 'windows')['src/core/a.c']
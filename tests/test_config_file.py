@@ -0,0 +1,79 @@
+from dataclasses import fields
+
+import pytest
+
+from makefile_generator.api import ProjectConfig
+from makefile_generator.core.config_file import _KNOWN, dump_config, load_config
+
+
+def _round_trip(tmp_path, project):
+    path = tmp_path / 'mkgen.toml'
+    path.write_text(dump_config(project))
+    return load_config(path)
+
+
+def test_non_default_values_round_trip(tmp_path):
+    project = {
+        'target_system': 'linux',
+        'lang': 'c++',
+        'compiler': {'name': 'clang++', 'std': 'c++20'},
+        'output_file': 'game "deluxe"',
+        'directories': {'src': 'source', 'include': 'headers'},
+        'packages': ['glfw3', 'libpng'],
+        'pkg_config': 'resolve',
+        'recursive': True,
+        'pch': 4,
+        'ignore': ['third_party/*'],
+        'explicit_sources': False,
+        'compile_commands': True,
+        'targets': [
+            {'name': 'core', 'type': 'static'},
+            {'name': 'app', 'type': 'executable', 'src': '.', 'deps': ['core']}
+        ]
+    }
+    loaded = _round_trip(tmp_path, project)
+    assert loaded == {
+        **project,
+        'directories': {'bin': 'bin', 'src': 'source', 'build': 'build', 'include': 'headers'}
+    }
+    assert loaded['explicit_sources'] is False and loaded['compile_commands'] is True
+    assert ProjectConfig.from_project(loaded).to_project()['output_file'] == 'game "deluxe"'
+
+
+def test_unset_values_are_left_out(tmp_path):
+    project = {
+        'cross_platform': True,
+        'target_system': 'linux',
+        'lang': 'c',
+        'compiler': {'name': 'gcc', 'std': 'c11'},
+        'gui_lib': None,
+        'packages': [],
+        'use_gui_lib': False,
+        'output': 'somewhere'
+    }
+    text = dump_config(project)
+    assert text.startswith('# Generated by mkgen')
+    assert _round_trip(tmp_path, project) == {
+        'cross_platform': True,
+        'lang': 'c',
+        'compiler': {'name': 'gcc', 'std': 'c11'},
+        'directories': {'bin': 'bin', 'src': 'src', 'build': 'build', 'include': 'include'}
+    }
+
+
+def test_unknown_keys_are_rejected(tmp_path):
+    path = tmp_path / 'mkgen.toml'
+    path.write_text('target_system = "linux"\nlang = "c"\nrecusive = true\n')
+    with pytest.raises(ValueError, match='unknown keys: recusive'):
+        load_config(path)
+
+
+def test_batch_manifests_are_rejected(tmp_path):
+    path = tmp_path / 'mkgen.toml'
+    path.write_text('[[projects]]\noutput = "a"\n')
+    with pytest.raises(ValueError, match='generate-many'):
+        load_config(path)
+
+
+def test_every_project_setting_can_be_saved():
+    assert {item.name for item in fields(ProjectConfig)} <= _KNOWN
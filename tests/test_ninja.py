@@ -0,0 +1,97 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from makefile_generator.core.ninja import NINJA_MANIFEST, ninja_manifest, plan_ninja
+from makefile_generator.core.project import build_data
+from makefile_generator.core.render import render_files
+from makefile_generator.core.scan import scan_project
+
+TARGETS = [
+    {'name': 'core', 'type': 'shared'},
+    {'name': 'app', 'src': '.', 'deps': ['core']}
+]
+
+
+def _plan(root, project):
+    data = build_data(project)
+    data['sources'] = scan_project(root, data)
+    return plan_ninja(root, data, project)
+
+
+def test_single_binary(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/util.c': ''})
+    plan = _plan(root, {**project, 'backend': 'ninja'})
+    [target] = plan['targets']
+    assert target['output'] == 'main'
+    assert target['objects'] == [['src/main.c', 'main.o'], ['src/util.c', 'util.o']]
+    assert plan['main'] is target
+    assert plan['source_dirs'] == ['src']
+
+
+def test_targets_link_in_dependency_order(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/core/a.c': ''})
+    plan = _plan(root, {**project, 'backend': 'ninja', 'targets': TARGETS})
+    core, app = plan['targets']
+    assert (core['output'], core['pic']) == ('libcore.so', '-fPIC')
+    assert core['objects'] == [['src/core/a.c', 'core/a.o']]
+    assert (app['output'], app['pic'], app['libs']) == ('app', '', ['libcore.so'])
+    assert app['objects'] == [['src/main.c', 'main.o']]
+
+
+def test_regeneration_depends_on_target_directories(make_tree, project):
+    # Without 'recursive', a file added to src/core must still regenerate build.ninja.
+    root = make_tree({'src/main.c': '', 'src/core/a.c': '', 'src/other/b.c': ''})
+    plan = _plan(root, {**project, 'backend': 'ninja', 'targets': TARGETS})
+    assert plan['source_dirs'] == ['src', 'src/core']
+
+
+def test_recursive_regeneration_depends_on_every_directory(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/a/b/c.c': ''})
+    plan = _plan(root, {**project, 'backend': 'ninja', 'recursive': True})
+    assert plan['source_dirs'] == ['src', 'src/a', 'src/a/b']
+
+
+def test_pch_is_not_supported(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    with pytest.raises(ValueError, match='pch'):
+        _plan(root, {**project, 'backend': 'ninja', 'pch': True})
+
+
+def test_render_files_writes_build_ninja_and_manifest(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    files = render_files({**project, 'backend': 'ninja'}, root)
+    assert 'build.ninja' in files and 'Makefile' not in files
+    assert 'build build.ninja: regen .mkgen/ninja.json | src\n' in files['build.ninja']
+    [manifest] = json.loads(files[NINJA_MANIFEST])
+    assert manifest['output'] == '..'
+    assert files[NINJA_MANIFEST] == ninja_manifest({**project, 'backend': 'ninja'})
+
+
+def test_regen_rule_restats_its_output(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    build = render_files({**project, 'backend': 'ninja'}, root)['build.ninja']
+    rule = build[build.index('rule regen\n'):].split('\n\n')[0]
+    assert '  generator = 1\n' in rule
+    assert '  restat = 1' in rule
+
+
+@pytest.mark.skipif(not (shutil.which('ninja') and shutil.which('mkgen')), reason='needs ninja and mkgen on PATH')
+def test_unchanged_regeneration_is_not_repeated(make_tree, project):
+    root = make_tree({'src/main.c': 'int main(void) { return 0; }\n'})
+    files = render_files({**project, 'backend': 'ninja'}, root)
+    for name, content in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(content)
+
+    def ninja() -> str:
+        return subprocess.run(['ninja', '-C', str(root)], capture_output=True, text=True, check=True).stdout
+
+    ninja()
+    # A file coming and going moves the directory's mtime without changing build.ninja.
+    (root / 'src/notes.txt').write_text('')
+    (root / 'src/notes.txt').unlink()
+    assert 'Regenerating build.ninja' in ninja()
+    assert 'no work to do' in ninja()
@@ -0,0 +1,57 @@
+import shutil
+import subprocess
+
+import pytest
+
+from makefile_generator.api import ProjectConfig
+from makefile_generator.core import packages
+from makefile_generator.core.packages import (
+    PACKAGES,
+    clear_shell_cache,
+    package_flags,
+    register_package,
+    resolve_shell
+)
+
+
+def test_clear_shell_cache_queries_pkg_config_again(monkeypatch):
+    answers = iter(['-lold', '-lnew'])
+    calls = []
+
+    def run(command, **kwargs):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout=next(answers))
+
+    clear_shell_cache()
+    monkeypatch.setattr(shutil, 'which', lambda name: name)
+    monkeypatch.setattr(packages.subprocess, 'run', run)
+    flags = '$(shell pkg-config --libs mkgen-test)'
+    assert resolve_shell(flags) == '-lold'
+    assert resolve_shell(flags) == '-lold'
+    clear_shell_cache()
+    assert resolve_shell(flags) == '-lnew'
+    assert len(calls) == 2
+    clear_shell_cache()
+
+
+def test_unknown_packages_are_not_registered():
+    before = dict(PACKAGES)
+    flags = package_flags('libpng')
+    assert flags == {
+        'win32': '-lpng',
+        'unix': '$(shell pkg-config --libs libpng)',
+        'cflags': '$(shell pkg-config --cflags libpng)'
+    }
+    ProjectConfig(lang='c', compiler='gcc', standard='c11', target_system='linux', packages=['glfw3'])
+    assert PACKAGES == before
+
+
+def test_register_package(monkeypatch):
+    monkeypatch.setattr(packages, 'PACKAGES', dict(PACKAGES))
+    register_package('vulkan', windows='-lvulkan-1')
+    assert package_flags('vulkan')['win32'] == '-lvulkan-1'
+    assert packages.PACKAGES['vulkan']['unix'] == '$(shell pkg-config --libs vulkan)'
+    with pytest.raises(ValueError):
+        register_package('bad name')
+    with pytest.raises(ValueError):
+        package_flags('$(rm -rf)')
@@ -0,0 +1,64 @@
+from makefile_generator.core.includes import parse_includes, parse_unconditional_includes
+from makefile_generator.core.pch import pch_files, plan_pch
+from makefile_generator.core.project import build_data
+from makefile_generator.core.scan import scan_project
+
+SOURCE = b'''#include <stdio.h>
+#include "util.h"
+#ifdef _WIN32
+#  include <windows.h>
+#else
+#  include <unistd.h>
+#endif
+int main(void) { return 0; }
+'''
+
+
+def _plan(root, project, max_headers=8):
+    data = build_data(project)
+    data['sources'] = scan_project(root, data)
+    return plan_pch(root, data, max_headers)
+
+
+def test_conditional_includes_are_skipped():
+    assert parse_includes(SOURCE) == [('<', 'stdio.h'), ('"', 'util.h'), ('<', 'windows.h'), ('<', 'unistd.h')]
+    assert parse_unconditional_includes(SOURCE) == [('<', 'stdio.h'), ('"', 'util.h')]
+
+
+def test_nested_conditionals_close_in_order():
+    content = b'#ifndef A\n#if B\n#include <b.h>\n#endif\n#include <a.h>\n#endif\n#include <c.h>\n'
+    assert parse_unconditional_includes(content) == [('<', 'c.h')]
+
+
+def test_shared_headers_are_ranked_by_fan_in(make_tree, project):
+    root = make_tree({
+        'src/a.c': SOURCE.decode(),
+        'src/b.c': SOURCE.decode(),
+        'src/c.c': '#include <stdio.h>\n',
+        'include/util.h': ''
+    })
+    plan = _plan(root, {**project, 'pch': True})
+    # windows.h and unistd.h are conditional, they never make it into the header.
+    assert plan['headers'] == ['<stdio.h>', '"util.h"']
+    assert plan['fan_in'] == {'<stdio.h>': 3, '"util.h"': 2}
+    assert plan['sources'] == 3
+    [(name, content)] = pch_files(plan).items()
+    assert name == '.mkgen/mkgen_pch.h'
+    assert '#include <stdio.h> /* included by 3 of 3 sources */' in content
+    assert 'windows.h' not in content
+
+
+def test_unreachable_and_single_use_headers_are_left_out(make_tree, project):
+    root = make_tree({
+        'src/a.c': '#include "missing.h"\n#include <only_once.h>\n',
+        'src/b.c': '#include "missing.h"\n'
+    })
+    assert _plan(root, project) is None
+
+
+def test_max_headers(make_tree, project):
+    root = make_tree({
+        'src/a.c': '#include <stdio.h>\n#include <string.h>\n',
+        'src/b.c': '#include <stdio.h>\n#include <string.h>\n'
+    })
+    assert _plan(root, project, max_headers=1)['headers'] == ['<stdio.h>']
@@ -0,0 +1,71 @@
+import os
+import stat
+
+import pytest
+
+from makefile_generator.core.render import (
+    STAMP_PREFIX,
+    file_status,
+    render_files,
+    write_atomic,
+    write_if_changed
+)
+
+
+@pytest.fixture
+def makefiles(make_tree, project):
+    '''The Makefile of a project, and the one it gets after a change of standard.'''
+    root = make_tree({'src/main.c': ''})
+    old = render_files(project, root)['Makefile']
+    new = render_files({**project, 'compiler': {'name': 'gcc', 'std': 'c17'}}, root)['Makefile']
+    return root, old, new
+
+
+def test_makefile_is_stamped(makefiles):
+    root, old, new = makefiles
+    [stamp] = [line for line in old.splitlines() if STAMP_PREFIX in line]
+    assert ' inputs=' in stamp and ' content=' in stamp
+    assert old != new
+
+
+def test_file_status(makefiles):
+    root, old, new = makefiles
+    path = root / 'Makefile'
+    assert file_status(path, old) == 'missing'
+    path.write_text(old)
+    assert file_status(path, old) == 'unchanged'
+    # Generated by mkgen and untouched since: safe to replace.
+    assert file_status(path, new) == 'changed'
+    path.write_text(old.replace('MODE ?= release', 'MODE ?= debug'))
+    assert file_status(path, new) == 'edited'
+    path.write_text('all:\n\techo hand-written\n')
+    assert file_status(path, new) == 'edited'
+
+
+def test_write_if_changed_keeps_the_mtime(tmp_path):
+    path = tmp_path / 'Makefile'
+    assert write_if_changed(path, 'a\n')
+    os.utime(path, ns=(1, 1))
+    assert not write_if_changed(path, 'a\n')
+    assert path.stat().st_mtime_ns == 1
+    assert write_if_changed(path, 'b\n')
+    assert path.read_text() == 'b\n'
+
+
+def test_write_atomic_keeps_permissions(tmp_path):
+    path = tmp_path / 'Makefile'
+    path.write_text('old\n')
+    path.chmod(0o640)
+    write_atomic(path, 'new\n')
+    assert path.read_text() == 'new\n'
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    path.chmod(0o755)
+    write_atomic(path, 'newer\n')
+    assert stat.S_IMODE(path.stat().st_mode) == 0o755
+
+
+def test_write_atomic_creates_directories_and_cleans_up(tmp_path):
+    path = tmp_path / '.mkgen/unity/unity_0.c'
+    write_atomic(path, 'x\n')
+    assert path.read_text() == 'x\n'
+    assert [entry.name for entry in path.parent.iterdir()] == ['unity_0.c']
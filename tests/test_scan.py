@@ -0,0 +1,71 @@
+import os
+
+from makefile_generator.core.project import build_data
+from makefile_generator.core.scan import project_sources, scan_project, scan_tree, select_sources
+
+
+def test_scan_tree_sorts_sources_and_headers(make_tree):
+    root = make_tree({
+        'src/main.c': '',
+        'src/b/util.c': '',
+        'src/b/util.h': '',
+        'src/notes.txt': '',
+        'src/.git/hook.c': ''
+    })
+    scan = scan_tree(root / 'src')
+    assert scan.sources == ['b/util.c', 'main.c']
+    assert scan.headers == ['b/util.h']
+    assert scan.directories == ['b']
+
+
+def test_scan_tree_depth_and_ignore(make_tree):
+    root = make_tree({
+        'src/main.c': '',
+        'src/a/a.c': '',
+        'src/a/deep/d.c': '',
+        'src/main_test.c': '',
+        'src/third_party/x.c': ''
+    })
+    assert scan_tree(root / 'src', depth=0).sources == ['main.c', 'main_test.c']
+    assert scan_tree(root / 'src', depth=1, ignore=['*_test.c', 'third_party/*']).sources == ['a/a.c', 'main.c']
+
+
+def test_index_reuses_unchanged_directories(make_tree):
+    root = make_tree({'src/main.c': '', 'src/a/a.c': ''})
+    # Directories modified within the racy window are always listed again.
+    for directory in (root / 'src', root / 'src/a'):
+        os.utime(directory, ns=(0, 0))
+    first = scan_tree(root / 'src')
+    second = scan_tree(root / 'src')
+    assert first.sources == second.sources == ['a/a.c', 'main.c']
+    assert second.reused == 2 and second.listed == 0
+
+
+def test_index_notices_new_files(make_tree):
+    root = make_tree({'src/main.c': ''})
+    scan_tree(root / 'src')
+    (root / 'src/extra.c').write_text('')
+    assert scan_tree(root / 'src').sources == ['extra.c', 'main.c']
+
+
+def test_scan_project_follows_recursive(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/a/a.c': ''})
+    assert scan_project(root, build_data(project)) == ['main.c']
+    assert scan_project(root, build_data({**project, 'recursive': True})) == ['a/a.c', 'main.c']
+
+
+def test_scan_project_reaches_target_directories(make_tree, project):
+    root = make_tree({'src/main.c': '', 'src/core/a.c': ''})
+    data = build_data({**project, 'targets': [
+        {'name': 'core', 'type': 'static'},
+        {'name': 'app', 'src': '.', 'deps': ['core']}
+    ]})
+    sources = scan_project(root, data)
+    assert sources == ['core/a.c', 'main.c']
+    assert select_sources(sources, 'core', recursive=False) == ['core/a.c']
+    assert select_sources(sources, '.', ['core'], recursive=False) == ['main.c']
+
+
+def test_project_sources_are_paths(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    assert project_sources(root, build_data(project)) == [root / 'src/main.c']
@@ -0,0 +1,95 @@
+import pytest
+
+from makefile_generator.core.project import build_data
+from makefile_generator.core.targets import parse_target, plan_targets
+
+
+def _by_name(targets):
+    return {target['name']: target for target in plan_targets(targets)}
+
+
+@pytest.mark.parametrize(('spec', 'target'), [
+    ('app', {'name': 'app', 'type': 'executable'}),
+    ('core:static', {'name': 'core', 'type': 'static'}),
+    ('render:shared:core', {'name': 'render', 'type': 'shared', 'deps': ['core']}),
+    ('tests:executable:core,,render', {'name': 'tests', 'type': 'executable', 'deps': ['core', 'render']})
+])
+def test_parse_target(spec, target):
+    assert parse_target(spec) == target
+
+
+def test_link_order_is_reverse_topological():
+    targets = _by_name([
+        {'name': 'core', 'type': 'static'},
+        {'name': 'math', 'type': 'static', 'deps': ['core']},
+        {'name': 'render', 'type': 'static', 'deps': ['core', 'math']},
+        {'name': 'game', 'deps': ['render', 'core']}
+    ])
+    # Dependents come before their dependencies, each library once.
+    assert targets['game']['libs'] == ['render', 'math', 'core']
+    assert targets['render']['libs'] == ['math', 'core']
+    assert targets['core']['libs'] == []
+
+
+def test_dependency_cycle_raises():
+    with pytest.raises(ValueError, match='a -> b -> c -> a'):
+        plan_targets([
+            {'name': 'a', 'type': 'static', 'deps': ['b']},
+            {'name': 'b', 'type': 'static', 'deps': ['c']},
+            {'name': 'c', 'type': 'static', 'deps': ['a']}
+        ])
+
+
+def test_static_libraries_linked_into_a_shared_one_are_pic():
+    targets = _by_name([
+        {'name': 'core', 'type': 'static'},
+        {'name': 'util', 'type': 'static'},
+        {'name': 'render', 'type': 'shared', 'deps': ['core']},
+        {'name': 'game', 'deps': ['render', 'util']}
+    ])
+    assert targets['render']['pic'] and targets['core']['pic']
+    assert not targets['util']['pic'] and not targets['game']['pic']
+
+
+def test_nested_targets_are_excluded_from_their_parent():
+    targets = _by_name([
+        {'name': 'core', 'type': 'static'},
+        {'name': 'app', 'src': '.', 'deps': ['core']},
+        {'name': 'tools', 'src': './tools/'}
+    ])
+    assert (targets['app']['dir'], targets['app']['exclude']) == ('.', ['core', 'tools'])
+    assert targets['core']['exclude'] == []
+
+
+@pytest.mark.parametrize(('targets', 'message'), [
+    ([], 'at least one'),
+    ([{'type': 'static'}], "needs a 'name'"),
+    ([{'name': 'a b'}], 'may only use'),
+    ([{'name': 'a'}, {'name': 'a'}], 'defined twice'),
+    ([{'name': 'a', 'type': 'module'}], "'type' must be one of"),
+    ([{'name': 'a', 'deps': ['b']}], "unknown target 'b'"),
+    ([{'name': 'a'}, {'name': 'b', 'deps': ['a']}], "cannot depend on executable 'a'"),
+    ([{'name': 'a', 'src': 'x'}, {'name': 'b', 'src': 'x/'}], 'share the directory x'),
+    ([{'name': 'a', 'src': '../x'}], 'inside the source directory')
+])
+def test_invalid_targets(targets, message):
+    with pytest.raises(ValueError, match=message):
+        plan_targets(targets)
+
+
+def test_output_file_defaults_to_the_first_executable(project):
+    data = build_data({**project, 'targets': [{'name': 'core', 'type': 'static'}, {'name': 'app', 'deps': ['core']}]})
+    assert data['output_file'] == 'app'
+
+
+@pytest.mark.parametrize('compiler', ['gcc', 'clang'])
+def test_pch_is_rejected_with_shared_targets(project, compiler):
+    # The precompiled header is built without -fPIC, which clang refuses to mix.
+    with pytest.raises(ValueError, match='shared library targets'):
+        build_data({
+            **project,
+            'compiler': {'name': compiler, 'std': 'c11'},
+            'pch': True,
+            'targets': [{'name': 'core', 'type': 'shared'}, {'name': 'app', 'deps': ['core']}]
+        })
+    assert build_data({**project, 'pch': True, 'targets': [{'name': 'core', 'type': 'static'}, {'name': 'app', 'deps': ['core']}]})
@@ -0,0 +1,122 @@
+import shutil
+import subprocess
+
+import pytest
+
+from makefile_generator.core.render import render_files
+
+SYSTEMS = [
+    {'target_system': 'linux'},
+    {'target_system': 'mac'},
+    {'target_system': 'windows'},
+    {'cross_platform': True, 'target_system': None}
+]
+
+
+def _makefile(root, project, **values) -> list[str]:
+    return render_files({**project, **values}, root)['Makefile'].splitlines()
+
+
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_header_dependencies_are_tracked(make_tree, project, system):
+    root = make_tree({'src/main.c': ''})
+    makefile = _makefile(root, project, **system)
+    assert 'DEPFLAGS := -MMD -MP' in makefile
+    assert 'DEPS := $(OBJS:.o=.d)' in makefile
+    assert '-include $(DEPS)' in makefile
+    assert any(line.endswith('$(DEPFLAGS) -c -o $@ $<') for line in makefile)
+
+
+@pytest.mark.parametrize('system', SYSTEMS[2:])
+def test_cl_turns_show_includes_into_a_depfile(make_tree, project, system):
+    root = make_tree({'src/main.c': ''})
+    makefile = _makefile(root, project, compiler={'name': 'cl', 'std': 'c11'}, **system)
+    assert 'DEPFLAGS := /showIncludes' in makefile
+    assert any('$(DEPFLAGS) /c /Fo$@ $< > $(@:.o=.log)' in line for line in makefile)
+    assert '\t$(Q)$(call MSVC_DEPFILE,$(@:.o=),$<)' in makefile
+    assert '-include $(DEPS)' in makefile
+    if system['target_system'] == 'windows':
+        assert 'DEPFLAGS := -MMD -MP' not in makefile
+
+
+@pytest.mark.parametrize('system', [SYSTEMS[0], SYSTEMS[3]])
+def test_linker_probe_is_cached_in_the_build_root(make_tree, project, system):
+    root = make_tree({'src/main.c': ''})
+    makefile = '\n'.join(_makefile(root, project, **system))
+    assert 'LINKER_PROBE := build/.linker-$(subst $() ,-,$(LINKER_CANDIDATES))' in makefile
+    # The compiler only runs when the saved answer is missing or for another compiler.
+    probe = makefile[makefile.index('LINKER := $(shell'):makefile.index('echo $$ld)')]
+    assert probe.index('read -r ld probed < $(LINKER_PROBE)') < probe.index('-fuse-ld=$$candidate')
+    assert 'LINKER := $(shell for ld' not in makefile
+
+
+def test_explicit_linker_is_not_probed(make_tree, project):
+    root = make_tree({'src/main.c': ''})
+    makefile = _makefile(root, project, linker='mold')
+    assert 'LINKER ?= mold' in makefile
+    assert not any('LINKER_PROBE' in line for line in makefile)
+
+
+@pytest.mark.skipif(not (shutil.which('make') and shutil.which('gcc')), reason='needs make and gcc')
+def test_no_op_builds_do_not_probe_the_linker(make_tree, project):
+    root = make_tree({'src/main.c': 'int main(void) { return 0; }\n'})
+    (root / 'Makefile').write_text(render_files(project, root)['Makefile'])
+    log = root / 'cc.log'
+    compiler = root / 'cc'
+    compiler.write_text(f'#!/bin/sh\necho "$*" >> {log}\nexec gcc "$@"\n')
+    compiler.chmod(0o755)
+
+    def make() -> list[str]:
+        log.write_text('')
+        subprocess.run(['make', '-s', '-C', str(root), f'CC={compiler}'], check=True, capture_output=True)
+        return log.read_text().splitlines()
+
+    assert any('-fuse-ld=' in line for line in make())
+    assert make() == []
+
+
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_each_mode_builds_into_its_own_directories(make_tree, project, system):
+    root = make_tree({'src/main.c': ''})
+    makefile = _makefile(root, project, directories={'bin': 'out', 'build': 'obj'}, **system)
+    assert 'BIN_ROOT := out' in makefile and 'BUILD_ROOT := obj' in makefile
+    assert 'CONFIG := $(patsubst pgo-%,pgo,$(MODE))' in makefile
+    assert 'BIN_DIR := $(BIN_ROOT)/$(CONFIG)' in makefile
+    assert 'BUILD_DIR := $(BUILD_ROOT)/$(CONFIG)' in makefile
+    assert any(line.startswith('OUT := $(BIN_DIR)/main') for line in makefile)
+
+
+@pytest.mark.parametrize('system', SYSTEMS)
+def test_flags_stamp_rebuilds_objects_and_output(make_tree, project, system):
+    root = make_tree({'src/main.c': ''})
+    makefile = _makefile(root, project, **system)
+    assert 'FLAGS_STAMP := $(BUILD_DIR)/.flags' in makefile
+    assert 'BUILD_FLAGS := $(CC) $(CCFLAGS) $(LDFLAGS)' in makefile
+    assert '$(OBJS): $(FLAGS_STAMP)' in makefile
+    assert '$(FLAGS_STAMP): ;' in makefile
+    assert '$(OUT): $(OBJS) $(FLAGS_STAMP) | $(BIN_DIR)' in makefile
+
+
+@pytest.mark.skipif(not (shutil.which('make') and shutil.which('gcc')), reason='needs make and gcc')
+def test_switching_modes_reuses_what_was_built(make_tree, project):
+    root = make_tree({'src/main.c': 'int main(void) { return 0; }\n', 'src/util.c': 'int util;\n'})
+    (root / 'Makefile').write_text(render_files(project, root)['Makefile'])
+
+    def compiled(*arguments: str) -> list[str]:
+        result = subprocess.run(
+            ['make', '-C', str(root), '--no-print-directory', *arguments],
+            check=True, capture_output=True, text=True
+        )
+        return sorted(line for line in result.stdout.splitlines() if line.startswith('Compiling src/'))
+
+    everything = ['Compiling src/main.c', 'Compiling src/util.c']
+    assert compiled('MODE=debug') == everything
+    assert compiled('MODE=release') == everything
+    assert (root / 'bin/debug/main').is_file() and (root / 'bin/release/main').is_file()
+    assert compiled('MODE=debug') == []
+    assert compiled('MODE=release') == []
+    # New flags rebuild that configuration only.
+    assert compiled('MODE=debug', 'LDFLAGS=-lm') == everything
+    assert compiled('MODE=debug', 'LDFLAGS=-lm') == []
+    assert compiled('MODE=release') == []
+    assert compiled('MODE=debug') == everything
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from makefile_generator.core.trace import build_profile
+
+
+def _time_trace(*events: dict) -> str:
+    return json.dumps({'traceEvents': list(events), 'beginningOfTime': 0})
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    build = tmp_path / 'build'
+    (build / 'release/core').mkdir(parents=True)
+    # Timestamps in microseconds: b overlaps a, c starts once a is done.
+    (build / 'release/a.time').write_text('src/a.c\n1000000\n1400000\n')
+    (build / 'release/core/b.time').write_text('src/core/b.c\n1100000\n1300000\n')
+    (build / 'release/c.time').write_text('src/c.c\n1450000\n1500000\n')
+    # Interrupted compile: no end timestamp.
+    (build / 'release/d.time').write_text('src/d.c\n1460000\n')
+    (build / 'release/a.json').write_text(_time_trace(
+        {'name': 'Source', 'ph': 'X', 'ts': 10, 'dur': 2000, 'args': {'detail': 'include/x.h'}},
+        {'name': 'Source', 'ph': 'X', 'ts': 20, 'dur': 100, 'args': {'detail': 'include/y.h'}},
+        {'name': 'Total Source', 'ph': 'X', 'ts': 0, 'dur': 5000},
+        {'name': 'Source', 'ph': 'B', 'ts': 0}
+    ))
+    (build / 'release/c.json').write_text(_time_trace(
+        {'name': 'Source', 'ph': 'X', 'ts': 5, 'dur': 1000, 'args': {'detail': 'include/x.h'}}
+    ))
+    (build / 'release/core/b.json').write_text('{not json')
+    return build
+
+
+def test_report(build_dir):
+    report, _ = build_profile(build_dir)
+    assert (report['units'], report['time_traces']) == (3, 2)
+    assert (report['wall_time_ms'], report['compile_time_ms'], report['parallelism']) == (500.0, 650.0, 1.3)
+    assert [(unit['source'], unit['duration_ms']) for unit in report['slowest_units']] == [
+        ('src/a.c', 400.0), ('src/core/b.c', 200.0), ('src/c.c', 50.0)
+    ]
+    assert report['slowest_units'][1]['object'] == (build_dir / 'release/core/b.o').as_posix()
+    assert report['slowest_headers'] == [
+        {'header': 'include/x.h', 'total_ms': 3.0, 'included': 2},
+        {'header': 'include/y.h', 'total_ms': 0.1, 'included': 1}
+    ]
+    assert len(build_profile(build_dir, top=1)[0]['slowest_units']) == 1
+
+
+def test_chrome_trace_lanes(build_dir):
+    _, trace = build_profile(build_dir)
+    compiles = {event['name']: event for event in trace['traceEvents'] if event['cat'] == 'compile'}
+    # b runs next to a, c reuses the lane a freed.
+    assert {name: (event['tid'], event['ts'], event['dur']) for name, event in compiles.items()} == {
+        'src/a.c': (0, 0, 400000),
+        'src/core/b.c': (1, 100000, 200000),
+        'src/c.c': (0, 450000, 50000)
+    }
+    clang = [(event['name'], event['tid'], event['ts']) for event in trace['traceEvents'] if event['cat'] == 'clang']
+    # Short events and the "Total" summaries are left out.
+    assert sorted(clang) == [('Source include/x.h', 0, 10), ('Source include/x.h', 0, 450005)]
+    assert trace['displayTimeUnit'] == 'ms'
+
+
+def test_nothing_traced(tmp_path):
+    (tmp_path / 'broken.time').write_text('src/a.c\n')
+    with pytest.raises(FileNotFoundError, match='build-profile'):
+        build_profile(tmp_path)
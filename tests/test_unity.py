@@ -0,0 +1,72 @@
+from makefile_generator.core.project import build_data
+from makefile_generator.core.scan import scan_project
+from makefile_generator.core.unity import _SLACK, balance, plan_unity, unity_files
+
+
+def _batch_of(groups: list[list[str]]) -> dict[str, int]:
+    return {path: index for index, group in enumerate(groups) for path in group}
+
+
+def _moved(before: dict[str, int], after: dict[str, int]) -> set[str]:
+    return {path for path in before.keys() & after.keys() if before[path] != after[path]}
+
+
+def test_adding_or_removing_a_file_leaves_the_others_in_place():
+    files = {f'file_{index}.c': 1000 for index in range(40)}
+    before = _batch_of(balance(files, 4))
+    added = _batch_of(balance({**files, 'added.c': 1000}, 4))
+    removed = _batch_of(balance({path: size for path, size in files.items() if path != 'file_0.c'}, 4))
+    assert 'added.c' in added
+    assert _moved(before, added) == set()
+    assert _moved(before, removed) == set()
+
+
+def test_edits_only_move_a_few_neighbours():
+    # A spill to the next preferred batch can move a neighbour, never the whole tree.
+    moves = []
+    for count in range(10, 60):
+        files = {f'file_{index}.c': 1000 for index in range(count)}
+        before = _batch_of(balance(files, 4))
+        moves.append(len(_moved(before, _batch_of(balance({**files, 'added.c': 1000}, 4)))))
+        moves.append(len(_moved(before, _batch_of(balance({path: size for path, size in files.items() if path != 'file_0.c'}, 4)))))
+    assert max(moves) <= 3
+    assert sum(moves) / len(moves) < 1
+
+
+def test_batches_are_size_balanced():
+    files = {f'file_{index}.c': 200 + (index * 7919) % 1800 for index in range(200)}
+    groups = balance(files, 8)
+    assert sorted(path for group in groups for path in group) == sorted(files)
+    assert len(groups) == 8
+    loads = [sum(files[path] for path in group) for group in groups]
+    assert max(loads) <= sum(files.values()) / 8 * _SLACK + max(files.values())
+
+
+def test_never_more_batches_than_files():
+    groups = balance({'a.c': 1, 'b.c': 1}, 8)
+    assert sorted(groups) == [['a.c'], ['b.c']]
+
+
+def test_batch_names_are_contiguous_after_empty_groups(make_tree, project):
+    # big.c fills a batch on its own, the small files leave one of the four empty.
+    root = make_tree({
+        'src/big.c': 'x' * 10000,
+        **{f'src/s{index}.c': 'x' * 10 for index in range(4)}
+    })
+    data = build_data(project)
+    data['sources'] = scan_project(root, data)
+    plan = plan_unity(root, data, 4)
+    assert plan['batches'] == ['unity_0.c', 'unity_1.c', 'unity_2.c']
+    assert sorted(path for group in plan['groups'].values() for path in group) == ['big.c', 's0.c', 's1.c', 's2.c', 's3.c']
+    files = unity_files(plan)
+    assert list(files) == [f'.mkgen/unity/{name}' for name in plan['batches']]
+    assert files['.mkgen/unity/unity_0.c'].splitlines()[1:] == ['#include "../../src/big.c"']
+
+
+def test_excluded_sources_keep_their_own_object(make_tree, project):
+    root = make_tree({'src/a.c': '', 'src/b.c': '', 'src/legacy/old.c': ''})
+    data = build_data({**project, 'recursive': True})
+    data['sources'] = scan_project(root, data)
+    plan = plan_unity(root, data, 2, ['legacy/*'])
+    assert plan['excluded'] == ['legacy/old.c']
+    assert sorted(path for group in plan['groups'].values() for path in group) == ['a.c', 'b.c']
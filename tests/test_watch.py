@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from makefile_generator.core.watch import Watcher
+
+BACKENDS = [True, False]
+
+
+def _waiting(watcher: Watcher, debounce: float) -> tuple[threading.Event, list[float]]:
+    '''Run watcher.wait() in the background: set once it returns, with its return time.'''
+    done = threading.Event()
+    returned: list[float] = []
+
+    def run() -> None:
+        watcher.wait(debounce)
+        returned.append(time.monotonic())
+        done.set()
+    threading.Thread(target=run, daemon=True).start()
+    return done, returned
+
+
+def _watcher(directories, files=(), polling=True) -> Watcher:
+    watcher = Watcher(directories, files, poll_interval=0.02, force_polling=polling)
+    if not polling and watcher.backend != 'inotify':
+        watcher.close()
+        pytest.skip('inotify is not available here')
+    return watcher
+
+
+@pytest.mark.parametrize('polling', BACKENDS)
+def test_new_source_is_noticed(tmp_path, polling):
+    (tmp_path / 'src/sub').mkdir(parents=True)
+    with _watcher([tmp_path / 'src'], polling=polling) as watcher:
+        done, _ = _waiting(watcher, 0.05)
+        time.sleep(0.1)
+        assert not done.is_set()
+        (tmp_path / 'src/sub/new.c').write_text('')
+        assert done.wait(5)
+
+
+@pytest.mark.parametrize('polling', BACKENDS)
+def test_changed_config_file_is_noticed(tmp_path, polling):
+    config = tmp_path / 'mkgen.toml'
+    config.write_text('a = 1\n')
+    (tmp_path / 'other.txt').write_text('')
+    with _watcher([], [config], polling=polling) as watcher:
+        done, _ = _waiting(watcher, 0.05)
+        time.sleep(0.1)
+        (tmp_path / 'other.txt').write_text('unrelated')
+        time.sleep(0.2)
+        assert not done.is_set()
+        config.write_text('a = 22\n')
+        assert done.wait(5)
+
+
+@pytest.mark.parametrize('polling', BACKENDS)
+def test_missing_directory_is_watched_once_created(tmp_path, polling):
+    with _watcher([tmp_path / 'src'], polling=polling) as watcher:
+        done, _ = _waiting(watcher, 0.05)
+        time.sleep(0.1)
+        (tmp_path / 'src').mkdir()
+        assert done.wait(5)
+        # Its content is watched from now on.
+        done, _ = _waiting(watcher, 0.05)
+        time.sleep(0.1)
+        assert not done.is_set()
+        (tmp_path / 'src/main.c').write_text('')
+        assert done.wait(5)
+
+
+@pytest.mark.parametrize('polling', BACKENDS)
+def test_bursts_are_debounced(tmp_path, polling):
+    (tmp_path / 'src').mkdir()
+    debounce = 0.3
+    with _watcher([tmp_path / 'src'], polling=polling) as watcher:
+        done, returned = _waiting(watcher, debounce)
+        time.sleep(0.1)
+        for index in range(5):
+            (tmp_path / f'src/file_{index}.c').write_text('')
+            last = time.monotonic()
+            time.sleep(0.1)
+            # Changes closer together than the debounce keep it waiting.
+            assert not done.is_set()
+        assert done.wait(5)
+        assert returned[0] - last >= debounce - 0.05
+
+
+@pytest.mark.parametrize('polling', BACKENDS)
+def test_missing_parents_are_followed_down(tmp_path, polling):
+    with _watcher([tmp_path / 'project/src'], polling=polling) as watcher:
+        (tmp_path / 'project/src').mkdir(parents=True)
+        done, _ = _waiting(watcher, 0.1)
+        assert done.wait(5)
+        done, _ = _waiting(watcher, 0.05)
+        time.sleep(0.1)
+        (tmp_path / 'project/src/main.c').write_text('')
+        assert done.wait(5)